@@ -0,0 +1,113 @@
+"""以保存的驗證碼圖片離線量測 OCR 的正確率與平均登入時間
+
+語料資料夾中每張圖片以正確答案命名（`<答案>.png` 或 `<答案>_<任意文字>.png`），
+執行 `python src/cli.py --save-captchas local/captchas ...` 登入成功時會自動保存。
+沒有語料時可以用 `--generate N` 從本機模擬網站產生。
+
+對每種前處理方式回報單次正確率、OCR 耗時，並依登入重試上限估計
+登入成功率與平均登入時間（每次嘗試的耗時為 OCR 加上 `--attempt-overhead`）。
+
+使用方式：
+    python benchmarks/bench_captcha.py local/captchas --attempts 3
+    python benchmarks/bench_captcha.py --generate 200
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), "src"))
+
+from captcha import PREPROCESS_MODES, CaptchaSolver  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(ROOT), "local", "captchas")
+
+
+def load_corpus(folder: str) -> List[Tuple[str, bytes]]:
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.png"))):
+        label = os.path.splitext(os.path.basename(path))[0].split("_")[0]
+        with open(path, "rb") as f:
+            corpus.append((label, f.read()))
+    return corpus
+
+
+def generate_corpus(folder: str, count: int, seed: int = 0):
+    from fake_lms import FakeLMS, FakeLMSConfig
+
+    lms = FakeLMS(FakeLMSConfig(decks=0, seed=seed))
+    for index in range(count):
+        image = lms.new_captcha("bench")
+        with open(os.path.join(folder, f"{lms.captchas['bench']}_{index}.png"), "wb") as f:
+            f.write(image)
+
+
+def evaluate(corpus: List[Tuple[str, bytes]], mode: str, attempts: int, overhead: float) -> Dict[str, float]:
+    solver = CaptchaSolver(mode)
+    load_start = time.perf_counter()
+    solver.warm().join()
+    load_seconds = time.perf_counter() - load_start
+
+    correct = 0
+    ocr_seconds = 0.0
+    for label, image in corpus:
+        start = time.perf_counter()
+        text = solver.solve(image)
+        ocr_seconds += time.perf_counter() - start
+        correct += text.lower() == label.lower()
+
+    accuracy = correct / len(corpus)
+    attempt_seconds = ocr_seconds / len(corpus) + overhead
+    failure = 1 - accuracy
+    # 第 i 次嘗試只有在前 i-1 次都失敗時才會發生
+    expected_attempts = sum(failure**i for i in range(attempts))
+    return {
+        "accuracy": accuracy,
+        "ocr_ms": ocr_seconds / len(corpus) * 1000,
+        "load_seconds": load_seconds,
+        "login_success": 1 - failure**attempts,
+        "expected_attempts": expected_attempts,
+        "time_to_login": expected_attempts * attempt_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, help="驗證碼圖片資料夾")
+    parser.add_argument("--generate", type=int, default=0, help="改用模擬網站產生指定數量的驗證碼")
+    parser.add_argument("--modes", nargs="+", choices=PREPROCESS_MODES, default=list(PREPROCESS_MODES))
+    parser.add_argument("--attempts", type=int, default=3, help="登入重試上限")
+    parser.add_argument(
+        "--attempt-overhead", type=float, default=1.0, help="每次嘗試除了 OCR 以外的耗時（載入頁面與送出表單，秒）"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as generated:
+        folder = args.corpus
+        if args.generate:
+            generate_corpus(generated, args.generate)
+            folder = generated
+        corpus = load_corpus(folder)
+        if not corpus:
+            print(f"{folder} 中沒有驗證碼圖片，請指定語料資料夾或使用 --generate", file=sys.stderr)
+            sys.exit(2)
+
+        print(f"語料：{len(corpus)} 張，登入重試上限 {args.attempts} 次")
+        print(f"{'前處理':<12}{'正確率':>8}{'OCR':>10}{'登入成功率':>12}{'平均嘗試':>10}{'平均登入時間':>14}")
+        for mode in args.modes:
+            result = evaluate(corpus, mode, args.attempts, args.attempt_overhead)
+            print(
+                f"{mode:<12}{result['accuracy']:>9.1%}{result['ocr_ms']:>8.1f} ms"
+                f"{result['login_success']:>14.1%}{result['expected_attempts']:>12.2f}"
+                f"{result['time_to_login']:>14.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
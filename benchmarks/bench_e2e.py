@@ -0,0 +1,181 @@
+"""以本機模擬網站量測完整的簡報下載流程
+
+對 `fake_lms.py` 啟動的模擬網站執行 `Browser.get_slides` 與 `Browser.image_to_pdf`，
+回報每分鐘簡報數、MB/s、各階段耗時與 peak RSS，並將結果附加到
+`benchmarks/results/e2e.jsonl`，與上一次相同設定的結果比較以找出效能退步。
+
+使用方式：
+    python benchmarks/bench_e2e.py --decks 5 --slides 74 --latency 0.02 --bandwidth 2000000
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), "src"))
+
+from fake_lms import add_config_arguments, config_from_args, login_over_http, start_fake_lms  # noqa: E402
+
+RESULTS_PATH = os.path.join(ROOT, "results", "e2e.jsonl")
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(args) -> Dict:
+    from browser import Browser
+    from metrics import metrics
+    from progress import Stage
+
+    config = config_from_args(args, check_captcha=False)
+    server, lms, base_url = start_fake_lms(config)
+
+    stage_times: Dict[str, float] = {"resolve": 0.0, "download": 0.0, "image_to_pdf": 0.0}
+    failures = 0
+    downloaded_bytes = 0
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # get_slides 以相對路徑寫入 slides/，在暫存資料夾中執行避免污染工作目錄
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            browser = Browser(login_url=base_url, max_workers=args.workers, use_session_cache=False, keep_images=True)
+            login_over_http(browser.session, base_url, config)
+            browser.cookies_synced = True
+
+            start = time.perf_counter()
+            for deck_id in range(1, config.decks + 1):
+                marks: Dict[str, float] = {}
+                events: List = []
+
+                def on_event(event, marks=marks, events=events):
+                    marks.setdefault(event.stage, time.perf_counter())
+                    events.append(event)
+
+                deck_start = time.perf_counter()
+                try:
+                    ok = browser.get_slides(f"{base_url}media/doc/{deck_id}", on_event)
+                except Exception as e:
+                    print(f"Deck {deck_id} 下載失敗：{e}")
+                    ok = False
+                deck_end = time.perf_counter()
+
+                if not ok:
+                    failures += 1
+                    continue
+                downloaded_bytes += events[-1].bytes
+                resolved = marks.get(Stage.DOWNLOADING, deck_end)
+                stage_times["resolve"] += resolved - deck_start
+                stage_times["download"] += deck_end - resolved
+            total_time = time.perf_counter() - start
+
+            # 另外量測從已下載的圖片重新產生 PDF 的時間
+            for deck_dir in sorted(glob.glob(os.path.join("slides", "*"))):
+                images = glob.glob(os.path.join(deck_dir, "*.jpg"))
+                images.sort(key=lambda path: int(os.path.splitext(os.path.basename(path))[0]))
+                pdf_start = time.perf_counter()
+                browser.image_to_pdf(images, os.path.join(deck_dir, "bench.pdf"))
+                stage_times["image_to_pdf"] += time.perf_counter() - pdf_start
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+
+    succeeded = config.decks - failures
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "config": {
+            "decks": config.decks,
+            "slides": config.slides,
+            "latency": config.latency,
+            "bandwidth": config.bandwidth,
+            "error_rate": config.error_rate,
+            "truncate_rate": config.truncate_rate,
+            "width": config.width,
+            "height": config.height,
+            "workers": args.workers,
+        },
+        "decks_succeeded": succeeded,
+        "decks_failed": failures,
+        "total_seconds": total_time,
+        "decks_per_minute": succeeded / total_time * 60 if total_time else 0.0,
+        "mb_per_second": downloaded_bytes / (1024 * 1024) / total_time if total_time else 0.0,
+        "stage_seconds": stage_times,
+        "server_requests": lms.requests,
+        "retries": metrics.snapshot()["counters"].get("slide.retries", 0),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def load_previous(config: Dict) -> Dict:
+    """找出上一次相同設定的結果"""
+    try:
+        with open(RESULTS_PATH, "r", encoding="utf-8") as f:
+            runs = [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return {}
+    matching = [run for run in runs if run.get("config") == config]
+    return matching[-1] if matching else {}
+
+
+def print_result(result: Dict, previous: Dict):
+    def compare(key: str, higher_is_better: bool = True) -> str:
+        if key not in previous or not previous[key]:
+            return ""
+        change = (result[key] - previous[key]) / previous[key] * 100
+        worse = change < 0 if higher_is_better else change > 0
+        return f"（{change:+.1f}%{'，退步' if worse and abs(change) >= 5 else ''}）"
+
+    print(f"版本：{result['revision']}，成功 {result['decks_succeeded']} 份，失敗 {result['decks_failed']} 份")
+    print(f"每分鐘簡報數：{result['decks_per_minute']:.1f}{compare('decks_per_minute')}")
+    print(f"下載速度：{result['mb_per_second']:.2f} MB/s{compare('mb_per_second')}")
+    print(f"總耗時：{result['total_seconds']:.2f} s{compare('total_seconds', higher_is_better=False)}")
+    for stage, seconds in result["stage_seconds"].items():
+        print(f"  {stage:<14}{seconds:>8.3f} s")
+    print(f"重試次數：{result.get('retries', 0)}，伺服器請求數：{result['server_requests']}")
+    print(f"peak RSS：{result['peak_rss_mb']:.1f} MB{compare('peak_rss_mb', higher_is_better=False)}")
+    if previous:
+        print(f"比較對象：{previous['revision']}（{previous['timestamp']}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_config_arguments(parser)
+    parser.add_argument("--workers", type=int, default=8, help="每份簡報同時下載的圖片數量")
+    parser.add_argument("--no-save", action="store_true", help="不保存這次的結果")
+    parser.set_defaults(decks=5)
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    previous = load_previous(result["config"])
+    print_result(result, previous)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+        with open(RESULTS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
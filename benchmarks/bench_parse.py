@@ -0,0 +1,119 @@
+"""比較簡報頁面的解析方式：BeautifulSoup 完整解析與 `extract.py` 只取出需要欄位
+
+產生與真實簡報頁面結構相同、帶有導覽列與腳本等雜訊的大型頁面，
+量測每種方式的耗時與 tracemalloc 記憶體峰值，並確認解析結果一致。
+
+使用方式：
+    python benchmarks/bench_parse.py --slides 500 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import extract  # noqa: E402
+
+NOISE = """<nav class="navbar"><ul>{items}</ul></nav>
+<script>window.config = {{"user": 1, "items": [{numbers}]}};</script>
+<div class="sidebar"><p>公告<p>作業<p>討論區</div>
+"""
+
+
+def make_page(slides: int) -> str:
+    items = "".join(f'<li class="nav-item"><a href="/course/{i}">課程 {i}</a></li>' for i in range(200))
+    numbers = ",".join(str(i) for i in range(2000))
+    body = "".join(
+        f'<div class="slide slide-{number}" data-page="{number}">'
+        f'<div class="toolbar"><span class="icon"></span><span>{number}</span></div>'
+        f'<img class="lazy" src="/sys/read_attach.php?id={number}&amp;page={number}.jpg" alt="第 {number} 頁">'
+        f'<p class="note">備註<br>{"說明文字 " * 20}</div>'
+        for number in range(1, slides + 1)
+    )
+    return (
+        "<html><head><title>iLearning</title></head><body>"
+        + NOISE.format(items=items, numbers=numbers)
+        + '<div class="title"> 簡報 &amp; 範例 </div>'
+        + body
+        + "</body></html>"
+    )
+
+
+def with_beautifulsoup(features: str) -> Callable[[str], Tuple[Optional[str], List[str]]]:
+    def parse(source: str):
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(source, features)
+        images = [slide.find("img")["src"] for slide in soup.find_all(class_="slide")]
+        title = soup.find(class_="title")
+        return (title.text.strip() if title else None), images
+
+    return parse
+
+
+def strip_title(parse: Callable[[str], Tuple[Optional[str], List[str]]]):
+    def run(source: str):
+        title, images = parse(source)
+        return (title.strip() if title is not None else None), images
+
+    return run
+
+
+def available_methods() -> Dict[str, Callable[[str], Tuple[Optional[str], List[str]]]]:
+    methods = {}
+    try:
+        import bs4  # noqa: F401
+
+        methods["bs4 html.parser"] = with_beautifulsoup("html.parser")
+        if extract.lxml_html is not None:
+            methods["bs4 lxml"] = with_beautifulsoup("lxml")
+    except ImportError:
+        pass
+    methods["extract HTMLParser"] = strip_title(extract.extract_with_parser)
+    if extract.lxml_html is not None:
+        methods["extract lxml"] = strip_title(extract.extract_with_lxml)
+    return methods
+
+
+def measure(parse, source: str, repeat: int) -> Tuple[float, float, Tuple]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(source)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(source)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / (1024 * 1024), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=500, help="頁面中的投影片數量")
+    parser.add_argument("--repeat", type=int, default=5, help="重複次數，取最短耗時")
+    args = parser.parse_args()
+
+    source = make_page(args.slides)
+    print(f"頁面大小：{len(source.encode('utf-8')) / 1024:.0f} KB，{args.slides} 張投影片")
+
+    baseline = None
+    expected = None
+    for name, parse in available_methods().items():
+        seconds, peak_mb, result = measure(parse, source, args.repeat)
+        if expected is None:
+            expected = result
+        elif result != expected:
+            print(f"{name} 的解析結果與其他方式不同")
+        baseline = baseline or seconds
+        print(f"{name:<20}{seconds * 1000:>9.1f} ms{peak_mb:>9.1f} MB{baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""比較 JPEG 直接嵌入、reportlab 與各種輸出設定的 PDF 產生耗時、記憶體峰值與檔案大小
+
+使用方式：
+    python benchmarks/bench_pdf.py [圖片資料夾] [--repeat N]
+
+預設使用 `notebooks/slides/lecture 2 python numpy` 中的 74 張投影片。
+每個方式都在獨立的子行程中執行，記憶體峰值 (peak RSS) 不會互相影響。
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+DEFAULT_DECK = os.path.join(ROOT, "notebooks", "slides", "lecture 2 python numpy")
+
+
+METHODS = ("reportlab", "jpeg", "150dpi", "96dpi", "96dpi-1cpu")
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float("nan")
+    # Linux 以 KB 為單位，macOS 以位元組為單位
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_once(method: str, image_paths, output_path, result_queue):
+    import export
+    import pdf_writer
+
+    writers = {
+        "jpeg": pdf_writer.write_jpeg_pdf,
+        "reportlab": pdf_writer.write_reportlab_pdf,
+        "150dpi": lambda paths, out: export.export_pdf(paths, out, export.get_profile("150dpi")),
+        "96dpi": lambda paths, out: export.export_pdf(paths, out, export.get_profile("96dpi")),
+        # 只用一個 worker，與上一行比較平行處理的效果
+        "96dpi-1cpu": lambda paths, out: export.export_pdf(paths, out, export.get_profile("96dpi"), max_workers=1),
+    }
+    writer = writers[method]
+    if method == "reportlab":
+        # 先載入 reportlab 與 PIL，讓記憶體增量只反映轉換本身
+        import PIL.Image  # noqa: F401
+        import reportlab.pdfgen.canvas  # noqa: F401
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    writer(image_paths, output_path)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    result_queue.put((elapsed, peak, peak - baseline, os.path.getsize(output_path)))
+
+
+def measure(method: str, image_paths, output_path):
+    result_queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run_once, args=(method, image_paths, output_path, result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("deck", nargs="?", default=DEFAULT_DECK, help="含有 JPEG 投影片的資料夾")
+    parser.add_argument("--repeat", type=int, default=3, help="每種方式執行的次數")
+    args = parser.parse_args()
+
+    image_paths = glob.glob(os.path.join(args.deck, "*.jpg"))
+    # 投影片以數字命名，依數字排序才是正確的頁序
+    image_paths.sort(key=lambda path: int(os.path.splitext(os.path.basename(path))[0]))
+    if not image_paths:
+        sys.exit(f"找不到 JPEG 圖片：{args.deck}")
+
+    deck_mb = sum(os.path.getsize(path) for path in image_paths) / (1024 * 1024)
+    print(f"投影片：{len(image_paths)} 張，共 {deck_mb:.1f} MB")
+    print(f"{'方式':<10}{'耗時 (s)':>12}{'peak RSS (MB)':>16}{'RSS 增量 (MB)':>16}{'PDF (MB)':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for method in METHODS:
+            runs = [measure(method, image_paths, os.path.join(tmp_dir, f"{method}.pdf")) for _ in range(args.repeat)]
+            elapsed = min(run[0] for run in runs)
+            peak = max(run[1] for run in runs)
+            delta = max(run[2] for run in runs)
+            size = runs[-1][3] / (1024 * 1024)
+            print(f"{method:<10}{elapsed:>12.3f}{peak:>16.1f}{delta:>16.1f}{size:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""本機模擬的 iLearning 網站，用於在不連線到 lms2020.nchu.edu.tw 的情況下量測效能
+
+提供與真實網站相同結構的頁面：
+    /                               首頁，未登入時有「登入」連結與登入表單
+    /captcha.png                    驗證碼圖片（對應 `.js-captcha`）
+    /login                          POST 帳號、密碼、驗證碼
+    /course/<id>                    課程頁面，列出所有簡報的連結（每份簡報有重複的連結）
+    /media/doc/<id>                 簡報頁面（`.title` 與 `.slide img`），支援 ETag
+    /media/doc/<id>/slides/<n>.jpg  投影片圖片，支援 ETag / Last-Modified
+
+可設定延遲、頻寬限制、錯誤注入與簡報大小。單獨執行時會啟動伺服器直到按下 Ctrl+C：
+    python benchmarks/fake_lms.py --port 8000 --slides 74 --latency 0.05
+"""
+
+import argparse
+import hashlib
+import io
+import random
+import re
+import secrets
+import string
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+COURSE_PATTERN = re.compile(r"^/course/(\d+)/?$")
+DECK_PATTERN = re.compile(r"^/media/doc/(\d+)/?$")
+SLIDE_PATTERN = re.compile(r"^/media/doc/(\d+)/slides/(\d+)\.jpg$")
+
+
+@dataclass
+class FakeLMSConfig:
+    # 每個請求回應前的延遲（秒）
+    latency: float = 0.0
+    # 每個回應的傳輸速度上限（位元組/秒），0 代表不限制
+    bandwidth: int = 0
+    # 投影片請求回傳 500 的機率
+    error_rate: float = 0.0
+    # 投影片回應內容被截斷的機率
+    truncate_rate: float = 0.0
+    # 簡報數量與每份簡報的投影片數
+    decks: int = 10
+    slides: int = 74
+    # 投影片圖片尺寸與 JPEG 品質
+    width: int = 1600
+    height: int = 1200
+    quality: int = 85
+    # 是否檢查驗證碼，關閉時任何驗證碼都能登入
+    check_captcha: bool = True
+    account: str = "test"
+    password: str = "test"
+    seed: int = 0
+
+
+class FakeLMS:
+    """模擬網站的狀態：登入 session、驗證碼與產生好的投影片"""
+
+    def __init__(self, config: FakeLMSConfig):
+        self.config = config
+        self.sessions: Dict[str, bool] = {}
+        self.captchas: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.random = random.Random(config.seed)
+        # 所有投影片共用少量不同內容的圖片，避免啟動時花太多時間產生
+        self.images = [self.render_slide(index) for index in range(8)]
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def render_slide(self, index: int) -> bytes:
+        from PIL import Image, ImageDraw
+
+        rng = random.Random(self.config.seed * 1000 + index)
+        img = Image.new("RGB", (self.config.width, self.config.height), (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        # 畫出隨機的色塊與線條，讓 JPEG 大小接近真實投影片
+        for _ in range(60):
+            x0, y0 = rng.randrange(self.config.width), rng.randrange(self.config.height)
+            x1, y1 = x0 + rng.randrange(20, 400), y0 + rng.randrange(10, 120)
+            color = tuple(rng.randrange(256) for _ in range(3))
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+        for _ in range(200):
+            points = [(rng.randrange(self.config.width), rng.randrange(self.config.height)) for _ in range(2)]
+            draw.line(points, fill=(0, 0, 0), width=2)
+
+        output = io.BytesIO()
+        img.save(output, format="JPEG", quality=self.config.quality)
+        return output.getvalue()
+
+    def slide_bytes(self, deck_id: int, number: int) -> bytes:
+        return self.images[(deck_id + number) % len(self.images)]
+
+    def new_session(self) -> str:
+        sid = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[sid] = False
+        return sid
+
+    def new_captcha(self, sid: str) -> bytes:
+        from PIL import Image, ImageDraw
+
+        text = "".join(self.random.choice(string.ascii_lowercase + string.digits) for _ in range(4))
+        with self.lock:
+            self.captchas[sid] = text
+        img = Image.new("RGB", (100, 40), (255, 255, 255))
+        ImageDraw.Draw(img).text((20, 12), text, fill=(0, 0, 0))
+        output = io.BytesIO()
+        img.save(output, format="PNG")
+        return output.getvalue()
+
+    def login(self, sid: str, account: str, password: str, captcha: str) -> bool:
+        with self.lock:
+            expected = self.captchas.pop(sid, None)
+            if account != self.config.account or password != self.config.password:
+                return False
+            if self.config.check_captcha and (expected is None or captcha.lower() != expected):
+                return False
+            self.sessions[sid] = True
+            return True
+
+    def is_logged_in(self, sid: Optional[str]) -> bool:
+        return bool(sid) and self.sessions.get(sid or "", False)
+
+
+LOGIN_PAGE = """<html><head><title>iLearning</title></head><body>
+<a href="/">登入</a>
+<form method="post" action="/login">
+  <input name="account"><input name="password" type="password">
+  <img class="js-captcha" src="/captcha.png"><input name="captcha">
+  <button type="submit" class="btn-text">登入</button>
+</form>
+</body></html>"""
+
+HOME_PAGE = """<html><head><title>iLearning</title></head><body>
+<a href="/logout">登出</a>
+<ul>{links}</ul>
+</body></html>"""
+
+COURSE_PAGE = """<html><head><title>Course {course_id}</title></head><body>
+<a href="/logout">登出</a>
+<table>{rows}</table>
+</body></html>"""
+
+DECK_PAGE = """<html><head><title>{title}</title></head><body>
+<div class="title"> {title} </div>
+{slides}
+</body></html>"""
+
+
+def make_handler(lms: FakeLMS):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def session_id(self) -> Optional[str]:
+            cookie = SimpleCookie(self.headers.get("Cookie", ""))
+            return cookie["sid"].value if "sid" in cookie else None
+
+        def send_body(
+            self,
+            status: int,
+            body: bytes,
+            content_type: str = "text/html; charset=utf-8",
+            headers: Optional[Dict[str, str]] = None,
+            truncate: bool = False,
+        ):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if truncate:
+                # 宣告完整長度但只送出一半後斷線，模擬傳輸中斷
+                self.send_header("Connection", "close")
+                self.close_connection = True
+                body = body[: len(body) // 2]
+            self.end_headers()
+            self.write_throttled(body)
+
+        def write_throttled(self, body: bytes):
+            bandwidth = lms.config.bandwidth
+            if not bandwidth:
+                self.wfile.write(body)
+            else:
+                chunk_size = max(1024, bandwidth // 20)
+                for start in range(0, len(body), chunk_size):
+                    chunk = body[start : start + chunk_size]
+                    self.wfile.write(chunk)
+                    time.sleep(len(chunk) / bandwidth)
+            with lms.lock:
+                lms.requests += 1
+                lms.bytes_sent += len(body)
+
+        def send_not_modified(self, validators: Dict[str, str]):
+            self.send_response(304)
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            with lms.lock:
+                lms.requests += 1
+
+        def redirect(self, location: str, headers: Optional[Dict[str, str]] = None):
+            self.send_response(302)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+
+        def do_GET(self):
+            if lms.config.latency:
+                time.sleep(lms.config.latency)
+
+            sid = self.session_id()
+            path = self.path.split("?")[0]
+
+            if path == "/":
+                if lms.is_logged_in(sid):
+                    links = "".join(
+                        f'<li><a href="/media/doc/{deck_id}">Deck {deck_id}</a></li>'
+                        for deck_id in range(1, lms.config.decks + 1)
+                    )
+                    self.send_body(200, HOME_PAGE.format(links=links).encode("utf-8"))
+                else:
+                    headers = {} if sid in lms.sessions else {"Set-Cookie": f"sid={lms.new_session()}; Path=/"}
+                    self.send_body(200, LOGIN_PAGE.encode("utf-8"), headers=headers)
+                return
+
+            if path == "/captcha.png":
+                if sid not in lms.sessions:
+                    sid = lms.new_session()
+                self.send_body(200, lms.new_captcha(sid), "image/png", {"Set-Cookie": f"sid={sid}; Path=/"})
+                return
+
+            if path == "/logout":
+                lms.sessions.pop(sid or "", None)
+                self.redirect("/")
+                return
+
+            match = COURSE_PATTERN.match(path)
+            if match:
+                if not lms.is_logged_in(sid):
+                    self.redirect("/")
+                    return
+                # 與真實網站相同，每份簡報的名稱與圖示各有一個連結
+                rows = "".join(
+                    f'<tr><td><a href="/media/doc/{deck_id}">Deck {deck_id}</a></td>'
+                    f'<td><a href="media/doc/{deck_id}?from=course#top">開啟</a></td></tr>'
+                    for deck_id in range(1, lms.config.decks + 1)
+                )
+                page = COURSE_PAGE.format(course_id=match.group(1), rows=rows)
+                self.send_body(200, page.encode("utf-8"))
+                return
+
+            match = DECK_PATTERN.match(path)
+            if match:
+                if not lms.is_logged_in(sid):
+                    self.redirect("/")
+                    return
+                deck_id = int(match.group(1))
+                slides = "".join(
+                    f'<div class="slide"><img src="/media/doc/{deck_id}/slides/{number}.jpg"></div>'
+                    for number in range(1, lms.config.slides + 1)
+                )
+                body = DECK_PAGE.format(title=f"Deck {deck_id}", slides=slides).encode("utf-8")
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_not_modified({"ETag": etag})
+                    return
+                self.send_body(200, body, headers={"ETag": etag})
+                return
+
+            match = SLIDE_PATTERN.match(path)
+            if match:
+                self.send_slide(int(match.group(1)), int(match.group(2)))
+                return
+
+            self.send_body(404, b"Not Found", "text/plain")
+
+        def send_slide(self, deck_id: int, number: int):
+            if number < 1 or number > lms.config.slides:
+                self.send_body(404, b"Not Found", "text/plain")
+                return
+
+            rng = lms.random
+            if lms.config.error_rate and rng.random() < lms.config.error_rate:
+                self.send_body(500, b"Internal Server Error", "text/plain")
+                return
+
+            body = lms.slide_bytes(deck_id, number)
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            validators = {"ETag": etag, "Last-Modified": lms.last_modified}
+
+            if self.headers.get("If-None-Match") == etag or self.not_modified_since():
+                self.send_not_modified(validators)
+                return
+
+            truncate = bool(lms.config.truncate_rate) and rng.random() < lms.config.truncate_rate
+            self.send_body(200, body, "image/jpeg", validators, truncate=truncate)
+
+        def not_modified_since(self) -> bool:
+            since = self.headers.get("If-Modified-Since")
+            if not since or self.headers.get("If-None-Match"):
+                return False
+            try:
+                return parsedate_to_datetime(since) >= parsedate_to_datetime(lms.last_modified)
+            except (TypeError, ValueError):
+                return False
+
+        def do_POST(self):
+            if lms.config.latency:
+                time.sleep(lms.config.latency)
+
+            if self.path != "/login":
+                self.send_body(404, b"Not Found", "text/plain")
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            sid = self.session_id() or lms.new_session()
+            ok = lms.login(
+                sid,
+                form.get("account", [""])[0],
+                form.get("password", [""])[0],
+                form.get("captcha", [""])[0],
+            )
+            self.redirect("/" if ok else "/?error=1", {"Set-Cookie": f"sid={sid}; Path=/"})
+
+    return Handler
+
+
+def start_fake_lms(config: FakeLMSConfig, port: int = 0) -> Tuple[ThreadingHTTPServer, FakeLMS, str]:
+    """在背景執行緒啟動模擬網站
+
+    Returns:
+        Tuple: (伺服器, 網站狀態, 首頁網址)
+    """
+    lms = FakeLMS(config)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(lms))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, lms, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def login_over_http(session, base_url: str, config: FakeLMSConfig):
+    """不經過瀏覽器直接登入模擬網站，驗證碼以關閉檢查的方式略過"""
+    session.get(base_url)
+    session.post(f"{base_url}login", data={"account": config.account, "password": config.password, "captcha": ""})
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    defaults = FakeLMSConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="每個請求的延遲（秒）")
+    parser.add_argument("--bandwidth", type=int, default=defaults.bandwidth, help="每個回應的頻寬上限（位元組/秒）")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="投影片回傳 500 的機率")
+    parser.add_argument("--truncate-rate", type=float, default=defaults.truncate_rate, help="投影片被截斷的機率")
+    parser.add_argument("--decks", type=int, default=defaults.decks, help="簡報數量")
+    parser.add_argument("--slides", type=int, default=defaults.slides, help="每份簡報的投影片數")
+    parser.add_argument("--width", type=int, default=defaults.width, help="投影片寬度")
+    parser.add_argument("--height", type=int, default=defaults.height, help="投影片高度")
+
+
+def config_from_args(args: argparse.Namespace, **overrides) -> FakeLMSConfig:
+    return FakeLMSConfig(
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        truncate_rate=args.truncate_rate,
+        decks=args.decks,
+        slides=args.slides,
+        width=args.width,
+        height=args.height,
+        **overrides,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--no-captcha-check", action="store_true", help="不檢查驗證碼")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    config = config_from_args(args, check_captcha=not args.no_captcha_check)
+    server, _, base_url = start_fake_lms(config, args.port)
+    print(f"模擬網站：{base_url}（帳號 {config.account} / 密碼 {config.password}）")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""將一批簡報直接寫入單一封存檔，不在 `slides/` 留下圖片與個別的 PDF
+
+- `.zip` / `.cbz`：每份簡報一個資料夾，投影片依序命名為 `0001.jpg`、`0002.jpg`…，
+  圖片本身已經壓縮，封存時不再壓縮
+- `.pdf`：所有簡報合併為一份 PDF，每份簡報一個書籤
+
+簡報依網址順序輪流寫入：輪到的簡報下載完一張就直接寫入封存檔，不經過暫存檔；
+同時下載的其他簡報只保留下載視窗內的圖片，等輪到時再寫入，封存檔內的順序固定與網址順序相同。
+某份簡報失敗時會移除它已寫入的內容。
+"""
+
+import os
+import re
+import threading
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set
+
+from export import ExportProfile, create_pdf_writer
+from manifest import temp_path
+
+ARCHIVE_FORMATS = (".zip", ".cbz", ".pdf")
+
+
+def archive_name(title: str) -> str:
+    """封存檔中的資料夾名稱，移除路徑分隔字元"""
+    return re.sub(r"[\\/:*?\"<>|]", "_", title).strip() or "untitled"
+
+
+class ArchiveSink(ABC):
+    """封存檔的共同流程，子類別實作 `begin_deck`、`add_slide`、`rollback` 與 `finish`"""
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.tmp_path = temp_path(output_path)
+        self.turn = threading.Condition()
+        # 簡報寫入的順序，以及已經結束（成功、失敗或不需寫入）的簡報
+        self.order: List[str] = []
+        self.finished: Set[str] = set()
+        self.decks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def reserve(self, urls: List[str]):
+        """依序預留簡報的寫入順序，未預留的簡報在開始寫入時才排到最後"""
+        with self.turn:
+            self.order.extend(url for url in urls if url not in self.order)
+
+    def current(self) -> Optional[str]:
+        """目前輪到寫入的簡報，呼叫端需持有 `turn`"""
+        for url in self.order:
+            if url not in self.finished:
+                return url
+        return None
+
+    def release(self, url: str):
+        """結束一份簡報的順序，讓下一份簡報開始寫入；沒有寫入任何內容就失敗的簡報也必須呼叫"""
+        with self.turn:
+            self.finished.add(url)
+            self.turn.notify_all()
+
+    @contextmanager
+    def deck(self, url: str, title: str) -> Iterator["ArchiveSink"]:
+        """等到輪到這份簡報後開始寫入；發生例外時移除這份簡報已寫入的內容
+
+        等待期間呼叫端不應繼續讀取下載結果，讓下載視窗限制記憶體用量。
+        """
+        with self.turn:
+            if url not in self.order:
+                self.order.append(url)
+            self.turn.wait_for(lambda: self.current() == url)
+        try:
+            self.begin_deck(title)
+            try:
+                yield self
+            except BaseException:
+                self.rollback()
+                raise
+            self.decks += 1
+        finally:
+            self.release(url)
+
+    @abstractmethod
+    def begin_deck(self, title: str):
+        """開始寫入一份簡報"""
+
+    @abstractmethod
+    def add_slide(self, index: int, data: bytes, extension: str = ".jpg"):
+        """寫入目前簡報的第 `index` 張投影片"""
+
+    @abstractmethod
+    def rollback(self):
+        """移除目前簡報已寫入的內容"""
+
+    @abstractmethod
+    def finish(self):
+        """寫完封存檔的結尾，之後暫存檔會改名為輸出檔案"""
+
+    def abort(self):
+        """放棄產生中的封存檔"""
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def close(self) -> bool:
+        """完成封存檔，沒有任何簡報時不產生檔案
+
+        Returns:
+            bool: 是否產生了封存檔
+        """
+        if not self.decks:
+            self.abort()
+            return False
+        self.finish()
+        os.replace(self.tmp_path, self.output_path)
+        return True
+
+
+class ZipSink(ArchiveSink):
+    """依序將投影片寫入 ZIP / CBZ"""
+
+    def __init__(self, output_path: str):
+        super().__init__(output_path)
+        self.zip = zipfile.ZipFile(self.tmp_path, "w", zipfile.ZIP_STORED, allowZip64=True)
+        self.folders: Set[str] = set()
+        self.folder = ""
+        # 失敗的簡報已寫入的項目，完成時才移除
+        self.entries: List[str] = []
+        self.removed: Set[str] = set()
+
+    def begin_deck(self, title: str):
+        folder = archive_name(title)
+        suffix = 2
+        while folder in self.folders:
+            folder = f"{archive_name(title)} ({suffix})"
+            suffix += 1
+        # 失敗的簡報也保留資料夾名稱，之後移除項目時不會誤刪同名的簡報
+        self.folders.add(folder)
+        self.folder = folder
+        self.entries = []
+
+    def add_slide(self, index: int, data: bytes, extension: str = ".jpg"):
+        info = zipfile.ZipInfo(f"{self.folder}/{index + 1:04d}{extension}", time.localtime()[:6])
+        self.zip.writestr(info, data)
+        self.entries.append(info.filename)
+
+    def rollback(self):
+        # zipfile 不支援刪除項目，先記下來，完成時再複製一份不含這些項目的封存檔
+        self.removed.update(self.entries)
+
+    def abort(self):
+        self.zip.close()
+        super().abort()
+
+    def finish(self):
+        self.zip.close()
+        if not self.removed:
+            return
+        rewrite_path = temp_path(self.tmp_path)
+        with (
+            zipfile.ZipFile(self.tmp_path) as source,
+            zipfile.ZipFile(rewrite_path, "w", zipfile.ZIP_STORED, allowZip64=True) as target,
+        ):
+            for info in source.infolist():
+                if info.filename not in self.removed:
+                    target.writestr(info, source.read(info))
+        os.replace(rewrite_path, self.tmp_path)
+
+
+class MergedPdfSink(ArchiveSink):
+    """將所有簡報合併為一份 PDF，每份簡報的第一頁加上書籤"""
+
+    def __init__(
+        self,
+        output_path: str,
+        profile: Optional[ExportProfile] = None,
+        max_workers: Optional[int] = None,
+    ):
+        super().__init__(output_path)
+        self.writer = create_pdf_writer(self.tmp_path, profile, max_workers)
+        self.start_page = 0
+
+    def begin_deck(self, title: str):
+        self.start_page = self.writer.page_count
+        self.writer.add_outline(title)
+
+    def add_slide(self, index: int, data: bytes, extension: str = ".jpg"):
+        self.writer.add_image_bytes(data)
+
+    def rollback(self):
+        self.writer.truncate(self.start_page)
+
+    def abort(self):
+        self.writer.abort()
+        super().abort()
+
+    def finish(self):
+        self.writer.close()
+
+
+def create_archive(
+    output_path: str,
+    profile: Optional[ExportProfile] = None,
+    max_workers: Optional[int] = None,
+) -> ArchiveSink:
+    """依副檔名建立封存檔，PDF 會套用輸出設定，ZIP / CBZ 保留原始圖片"""
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in ARCHIVE_FORMATS:
+        raise ValueError(f"不支援的封存格式：{output_path}，可用的副檔名為 {', '.join(ARCHIVE_FORMATS)}")
+    if extension == ".pdf":
+        return MergedPdfSink(output_path, profile, max_workers)
+    return ZipSink(output_path)
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, Optional
+
+from manifest import atomic_write, file_lock, temp_path
+
+
+class BlobStore:
+    """以內容的 SHA-256 命名的圖片儲存區，相同的圖片只保存一份
+
+    圖片保存在 `<root>/<前兩碼>/<sha256>`，各簡報資料夾中的 `<n>.jpg` 是指向這裡的硬連結
+    （不支援硬連結的檔案系統則改為複製）。`index.json` 記錄每個圖片網址對應的雜湊值與
+    ETag / Last-Modified，其他簡報引用同一個網址時可以直接以條件式請求確認，不必重新下載。
+    """
+
+    INDEX_FILENAME = "index.json"
+
+    def __init__(self, root: str = "slides/.blobs"):
+        self.root = root
+        self.index_path = os.path.join(root, self.INDEX_FILENAME)
+        self.urls: Dict[str, Dict[str, Any]] = {}
+        # 尚未寫回 index.json 的網址，多個行程同時使用時只覆寫自己更新的項目
+        self.dirty: Dict[str, Dict[str, Any]] = {}
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def has(self, digest: Optional[str]) -> bool:
+        return bool(digest) and os.path.exists(self.path_for(digest))
+
+    def read(self, digest: str) -> bytes:
+        with open(self.path_for(digest), "rb") as f:
+            return f.read()
+
+    def put(self, data: bytes) -> str:
+        """保存圖片並回傳其 SHA-256，已存在相同內容時不會重複寫入"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, data)
+        return digest
+
+    def link(self, digest: str, dest: str):
+        """在 `dest` 建立指向圖片的硬連結，已存在的檔案會被取代"""
+        source = self.path_for(digest)
+        tmp_path = temp_path(dest)
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, dest)
+
+    def load_index(self):
+        with self.lock:
+            if self.loaded:
+                return
+            self.loaded = True
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.urls = json.load(f).get("urls", {})
+            except (OSError, ValueError):
+                self.urls = {}
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """已知網址且圖片仍在儲存區時回傳其紀錄"""
+        self.load_index()
+        with self.lock:
+            entry = self.urls.get(url)
+        return entry if entry and self.has(entry.get("sha256")) else None
+
+    def remember(self, url: str, digest: str, size: int, etag: Optional[str], last_modified: Optional[str]):
+        entry = {"sha256": digest, "size": size, "etag": etag, "last_modified": last_modified}
+        self.load_index()
+        with self.lock:
+            self.urls[url] = entry
+            self.dirty[url] = entry
+
+    def save_index(self):
+        """重新讀取 index.json 後合併本次更新的網址再寫回
+
+        讀取到寫回之間持有跨行程的檔案鎖，多個 worker 或命令列同時執行時不會互相覆蓋彼此的紀錄。
+        """
+        with self.lock:
+            if not self.dirty:
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with file_lock(self.index_path):
+                try:
+                    with open(self.index_path, "r", encoding="utf-8") as f:
+                        urls = json.load(f).get("urls", {})
+                except (OSError, ValueError):
+                    urls = {}
+                urls.update(self.dirty)
+                atomic_write(self.index_path, json.dumps({"urls": urls}, ensure_ascii=False).encode("utf-8"))
+            self.urls.update(urls)
+            self.dirty = {}
@@ -1,24 +1,116 @@
+import hashlib
 import os
+import threading
 import time
-from typing import List
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-import ddddocr
 import requests
-from bs4 import BeautifulSoup
-from PIL import Image
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
+
+from archive import ArchiveSink
+from blob_store import BlobStore
+from captcha import CaptchaSolver, save_captcha
+from crawler import HostRateLimiter, deck_id, find_deck_links
+from downloader import SlideDownloader, SlideResponse
+from export import PROFILES, ExportProfile, create_pdf_writer, export_pdf
+from extract import EXTRACT_SCRIPT, extract_from_script_result, extract_slides, has_link_text
+from manifest import DeckManifest, validator_headers
+from metrics import metrics
+from pdf_writer import NotJpegError, write_jpeg_pdf, write_reportlab_pdf
+from progress import ProgressEvent, Stage
+from session_cache import SessionCache
+
+# selenium、ddddocr 載入較慢，只在實際需要時才匯入，沿用快取 session 時完全不會載入
+if TYPE_CHECKING:
+    import ddddocr
+    from selenium import webdriver
+
+# 頁面上的「登入」連結文字，存在代表目前未登入
+LOGIN_LINK_TEXT = "登入"
+# 登入失敗時頁面上可能出現的錯誤訊息
+LOGIN_ERROR_SELECTOR = ".alert-danger, .has-error, .error, .text-danger"
+# 快速載入模式在登入後封鎖的資源，投影片圖片另外以 HTTP 下載，瀏覽器不需要載入
+BLOCKED_RESOURCE_PATTERNS = [
+    *(f"*.{ext}" for ext in ("jpg", "jpeg", "png", "gif", "webp", "svg", "ico", "bmp")),
+    *(f"*.{ext}" for ext in ("mp4", "webm", "mp3", "ogg", "m4a")),
+    *(f"*.{ext}" for ext in ("woff", "woff2", "ttf", "otf", "eot")),
+    "*.css",
+]
+
+
+class SessionExpiredError(Exception):
+    """以 HTTP 取得的頁面為未登入狀態，cookies 已失效"""
 
 
 class Browser:
-    def __init__(self, headless: bool = False, login_url: str = "https://lms2020.nchu.edu.tw/"):
+    def __init__(
+        self,
+        headless: bool = False,
+        login_url: str = "https://lms2020.nchu.edu.tw/",
+        max_workers: int = 8,
+        http_fetch: bool = True,
+        use_session_cache: bool = True,
+        keep_images: bool = True,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        fast_load: bool = False,
+        captcha_preprocess: str = "none",
+        max_login_attempts: int = 3,
+        captcha_dir: Optional[str] = None,
+        export_profile: Optional[ExportProfile] = None,
+    ):
         self.headless = headless
         self.login_url = login_url
-        self.ocr = ddddocr.DdddOcr()
+        self.max_workers = max_workers
+        # 登入後改用 HTTP 直接抓取簡報頁面，只有在需要 JavaScript 時才回到瀏覽器
+        self.http_fetch = http_fetch
+        # 是否保留每張投影片的 JPEG 檔案，關閉時只會產生 PDF
+        self.keep_images = keep_images
+        # PDF 的輸出設定，預設直接嵌入原始圖片
+        self.export_profile = export_profile or PROFILES["original"]
+        # 保留圖片時以內容雜湊保存，不同簡報中相同的圖片只保存與下載一次
+        self.blob_store = BlobStore() if keep_images else None
+        # 快速載入模式：不等待整個頁面載入完成，登入後也不載入圖片、影音、字型與樣式表
+        self.fast_load = fast_load
+        self.resources_blocked = False
+        # 驗證碼辨識錯誤時自動換一張重新登入的次數上限
+        self.max_login_attempts = max(1, max_login_attempts)
+        # 設定時保存每張驗證碼圖片，供 benchmarks/bench_captcha.py 離線調整
+        self.captcha_dir = captcha_dir
+        self.cookies_synced = False
+        # 從 session 快取還原登入時，瀏覽器本身尚未帶有 cookies
+        self.driver_needs_cookies = False
+        self.session_cache = SessionCache() if use_session_cache else None
+
+        # Chrome 與 OCR 模型在第一次需要時才啟動，沿用快取的 session 時可完全略過
+        self._driver: Optional["webdriver.Chrome"] = None
+        self.captcha_solver = CaptchaSolver(captcha_preprocess)
+        # 同時下載多份簡報時，瀏覽器一次只能由一個執行緒操作
+        self.driver_lock = threading.RLock()
+
+        self.session = requests.Session()
+        self.downloader = SlideDownloader(self.session, max_workers=self.max_workers, rate_limiter=rate_limiter)
+
+    @property
+    def driver(self) -> "webdriver.Chrome":
+        if self._driver is None:
+            with metrics.timer("browser.start"):
+                self._driver = self.create_driver()
+        return self._driver
+
+    @property
+    def driver_started(self) -> bool:
+        return self._driver is not None
+
+    @property
+    def ocr(self) -> "ddddocr.DdddOcr":
+        return self.captcha_solver.ocr
+
+    def warm_ocr(self):
+        """在背景載入 OCR 模型，與啟動瀏覽器、載入登入頁面同時進行"""
+        self.captcha_solver.warm()
+
+    def create_driver(self) -> "webdriver.Chrome":
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
 
         # 創建 Chrome 瀏覽器
         service = Service()
@@ -47,14 +139,48 @@ class Browser:
         if self.headless:
             options.add_argument("--headless")
 
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.session = requests.Session()
+        # DOM 解析完成即返回，不等待圖片等資源載入
+        if self.fast_load:
+            options.page_load_strategy = "eager"
+
+        return webdriver.Chrome(service=service, options=options)
 
     def login(self, account: str, password: str):
         self.account = account
         self.password = password
 
-        self.driver.get(self.login_url)
+        metrics.inc("login.attempts")
+
+        # 有尚未過期的 session 時直接沿用，不必啟動瀏覽器與辨識驗證碼
+        with metrics.timer("login.restore_session"):
+            restored = self.restore_session()
+        if restored:
+            metrics.inc("login.restored")
+            return True
+
+        # OCR 模型與瀏覽器同時載入
+        self.warm_ocr()
+        # 登入頁面的驗證碼是圖片，必須先解除封鎖
+        self.set_resource_blocking(False)
+
+        # 驗證碼辨識錯誤時重新載入登入頁面，以新的驗證碼再試一次
+        for attempt in range(self.max_login_attempts):
+            if attempt:
+                metrics.inc("login.retries")
+            if self.submit_login():
+                self.sync_cookies()
+                self.set_resource_blocking(self.fast_load)
+                metrics.inc("login.success")
+                return True
+        metrics.inc("login.failure")
+        return False
+
+    def submit_login(self) -> bool:
+        """載入登入頁面、填入帳號密碼與驗證碼後送出，回傳是否登入成功"""
+        from selenium.webdriver.common.by import By
+
+        with metrics.timer("login.page_load"):
+            self.driver.get(self.login_url)
 
         # 輸入帳號
         account_input_field = self.driver.find_element(By.NAME, "account")
@@ -67,7 +193,9 @@ class Browser:
         password_input_field.send_keys(self.password)
 
         # 輸入驗證碼
-        captcha = self.get_captcha()
+        with metrics.timer("login.captcha"):
+            captcha_image = self.get_captcha_image()
+            captcha = self.captcha_solver.solve(captcha_image)
         captcha_input_field = self.driver.find_element(By.NAME, "captcha")
         captcha_input_field.clear()
         captcha_input_field.send_keys(captcha)
@@ -76,13 +204,65 @@ class Browser:
         login_button = self.driver.find_element(By.CLASS_NAME, "btn-text")
         login_button.click()
 
-        time.sleep(2)
-        return self.is_login()
+        with metrics.timer("login.wait"):
+            self.wait_for_login_result(login_button)
+        success = self.is_login()
+        if self.captcha_dir:
+            save_captcha(self.captcha_dir, captcha_image, captcha, success)
+        return success
+
+    def wait_for_login_result(self, login_button, timeout: float = 10):
+        """等待按下登入後的頁面結果，頁面換頁完成或出現錯誤提示時立即返回"""
+        from selenium.common.exceptions import (
+            NoAlertPresentException,
+            StaleElementReferenceException,
+            TimeoutException,
+        )
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        def settled(driver) -> bool:
+            # 驗證碼或帳密錯誤時網站可能以 alert 提示
+            try:
+                driver.switch_to.alert.accept()
+                return True
+            except NoAlertPresentException:
+                pass
+
+            # 登入鍵失效代表已換頁，等待新頁面解析完成
+            try:
+                login_button.is_enabled()
+            except StaleElementReferenceException:
+                return driver.execute_script("return document.readyState") != "loading"
+
+            # 仍停留在原頁面時，出現錯誤訊息代表登入失敗
+            return bool(driver.find_elements(By.CSS_SELECTOR, LOGIN_ERROR_SELECTOR))
+
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(settled)
+        except TimeoutException:
+            pass
+
+    def set_resource_blocking(self, enabled: bool):
+        """透過 Chrome DevTools Protocol 封鎖或解除封鎖圖片、影音、字型與樣式表"""
+        if enabled == self.resources_blocked or not self.driver_started:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd(
+                "Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_PATTERNS if enabled else []}
+            )
+            self.resources_blocked = enabled
+        except Exception as e:
+            print(f"無法設定資源封鎖：{e}")
 
     def is_login(self):
+        from selenium.common.exceptions import NoSuchElementException
+        from selenium.webdriver.common.by import By
+
         try:
             # 有登入鍵代表目前未登入
-            self.driver.find_element(By.LINK_TEXT, "登入")
+            self.driver.find_element(By.LINK_TEXT, LOGIN_LINK_TEXT)
             return False
         except NoSuchElementException:
             return True
@@ -90,118 +270,484 @@ class Browser:
             print(e)
             return False
 
-    def get_captcha(self):
-        # 確保有 local 資料夾
-        os.makedirs("./local", exist_ok=True)
+    def sync_cookies(self):
+        """將瀏覽器登入後的 cookies 複製到 `self.session`，讓之後的請求不必經過瀏覽器"""
+        cookies = self.driver.get_cookies()
 
-        captcha_image = self.driver.find_element(By.CLASS_NAME, "js-captcha")
-        captcha_image.screenshot("./local/captcha.png")
+        # 使用與瀏覽器相同的 User-Agent，避免伺服器將 session 視為不同的用戶端
+        user_agent = self.driver.execute_script("return navigator.userAgent")
+        self.import_session({"cookies": cookies, "user_agent": user_agent})
+        # cookies 本來就來自瀏覽器，不需要再寫回去
+        self.driver_needs_cookies = False
+
+        if self.session_cache and getattr(self, "account", None):
+            self.session_cache.save(self.login_url, self.account, self.password, cookies, user_agent)
 
-        with open("./local/captcha.png", "rb") as f:
-            image = f.read()
-        captcha = str(self.ocr.classification(image))
-        return captcha
+    def restore_session(self) -> bool:
+        """嘗試從 session 快取還原登入狀態
 
-    def get_slides(self, url: str, status_callback=None):
-        self.driver.get(url)
-        source = self.driver.page_source
+        Returns:
+            bool: 快取存在、密碼與快取相符且伺服器仍視為已登入時回傳 True
+        """
+        if not self.session_cache:
+            return False
 
-        soup = BeautifulSoup(source, "html.parser")
+        data = self.session_cache.load(self.login_url, self.account, self.password)
+        if not data:
+            return False
 
-        # 尋找 classname 為 slide 的元素
-        slides = soup.find_all(class_="slide")
+        self.import_session(data)
 
-        images = [slide.find("img")["src"] for slide in slides]
-        full_urls = [f"{self.login_url.removesuffix('/')}/{image.removeprefix('/')}" for image in images]
+        if self.probe_session():
+            return True
 
+        # 伺服器端 session 已失效
+        self.session_cache.clear(self.login_url, self.account)
+        self.session.cookies.clear()
+        self.cookies_synced = False
+        self.driver_needs_cookies = False
+        return False
+
+    def export_session(self) -> Dict[str, Any]:
+        """匯出目前 HTTP session 的 cookies 與 User-Agent，供其他行程共用同一個登入狀態"""
+        cookies = [
+            {"name": cookie.name, "value": cookie.value, "domain": cookie.domain, "path": cookie.path}
+            for cookie in self.session.cookies
+        ]
+        return {"cookies": cookies, "user_agent": self.session.headers.get("User-Agent")}
+
+    def import_session(self, data: Dict[str, Any]):
+        """匯入 `export_session` 或 session 快取的內容，之後的請求即以該帳號登入的身分送出"""
+        for cookie in data["cookies"]:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+        if data.get("user_agent"):
+            self.session.headers["User-Agent"] = data["user_agent"]
+
+        if data["cookies"]:
+            self.cookies_synced = True
+            self.driver_needs_cookies = True
+
+    def probe_session(self) -> bool:
+        """以單一 HTTP 請求確認目前 cookies 是否仍為登入狀態"""
         try:
-            slide_name = soup.find(class_="title").text.strip()  # pyright: ignore
-        except AttributeError:
-            if status_callback:
-                status_callback("無法取得簡報名稱")
+            response = self.session.get(self.login_url, timeout=10)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"確認登入狀態失敗：{e}")
             return False
 
-        if status_callback:
-            status_callback(f"開始下載簡報：{slide_name}")
+        return not self.is_login_page(response.text)
 
-        os.makedirs(f"slides/{slide_name}", exist_ok=True)
+    @staticmethod
+    def is_login_page(source: str) -> bool:
+        """頁面上有登入連結代表目前未登入，與 is_login 的判斷方式相同"""
+        return has_link_text(source, LOGIN_LINK_TEXT)
 
-        # 儲存所有下載的圖片路徑
-        downloaded_images = []
-        total_slides = len(full_urls)
+    def ensure_driver_session(self):
+        """讓瀏覽器帶上從快取還原的 cookies，供需要 JavaScript 的頁面使用"""
+        if not self.driver_needs_cookies:
+            return
 
-        for i, image_url in enumerate(full_urls):
-            image_path = f"slides/{slide_name}/{image_url.split('/')[-1]}"
-            response = self.session.get(image_url)
-            with open(image_path, "wb") as f:
-                f.write(response.content)
+        self.driver.get(self.login_url)
+        for cookie in self.session.cookies:
+            self.driver.add_cookie(
+                {"name": cookie.name, "value": cookie.value or "", "domain": cookie.domain, "path": cookie.path}
+            )
+        self.driver_needs_cookies = False
+        self.set_resource_blocking(self.fast_load)
 
-            downloaded_images.append(image_path)
-            if status_callback:
-                status_callback(f"下載進度：{i + 1}/{total_slides} ({((i + 1) / total_slides * 100):.0f}%)")
+    def get_captcha_image(self) -> bytes:
+        """取得驗證碼圖片的 PNG 內容，不經過暫存檔"""
+        from selenium.webdriver.common.by import By
 
-        # 生成 PDF 檔案
-        if status_callback:
-            status_callback("正在生成 PDF 檔案...")
-        pdf_path = f"slides/{slide_name}/簡報.pdf"
-        if self.image_to_pdf(downloaded_images, pdf_path):
-            if status_callback:
-                status_callback(f"簡報下載完成：{slide_name}")
-            return True
-        else:
+        captcha_image = self.driver.find_element(By.CLASS_NAME, "js-captcha")
+        # eager 載入策略下驗證碼圖片可能還在下載，等圖片載入完成再截圖
+        self.wait_for_image(captcha_image)
+        return captcha_image.screenshot_as_png
+
+    def get_captcha(self) -> str:
+        return self.captcha_solver.solve(self.get_captcha_image())
+
+    def wait_for_image(self, image, timeout: float = 5):
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.05).until(
+                lambda driver: driver.execute_script(
+                    "return arguments[0].complete && arguments[0].naturalWidth > 0", image
+                )
+            )
+        except TimeoutException:
+            pass
+
+    def parse_slides(self, source: str):
+        """從簡報頁面原始碼取出簡報名稱與所有投影片圖片網址
+
+        Returns:
+            Tuple[Optional[str], List[str]]: 簡報名稱（找不到時為 None）與投影片圖片的完整網址列表
+        """
+        slide_name, images = extract_slides(source)
+        return slide_name, self.full_slide_urls(images)
+
+    def full_slide_urls(self, images: List[str]) -> List[str]:
+        return [f"{self.login_url.removesuffix('/')}/{image.removeprefix('/')}" for image in images]
+
+    def fetch_slides(self, url: str):
+        """取得簡報名稱與投影片圖片網址
+
+        已登入且同步過 cookies 時直接以 HTTP 取得頁面，
+        若頁面內容需要 JavaScript 才能產生（解析不到投影片）才改用瀏覽器載入。
+        cookies 已失效時拋出 `SessionExpiredError`，不會改用瀏覽器。
+        """
+        response = self.http_get_page(url, "page.http_fetch")
+        if response is not None:
+            try:
+                with metrics.timer("page.parse"):
+                    slide_name, full_urls = self.parse_slides(response.text)
+                if slide_name and full_urls:
+                    return slide_name, full_urls
+            except Exception as e:
+                print(f"解析簡報頁面失敗，改用瀏覽器：{e}")
+
+        metrics.inc("page.driver_fallback")
+        # 直接在瀏覽器中取出需要的欄位，不序列化整份 DOM
+        with self.driver_lock:
+            self.driver_load(url, wait_selector=".slide")
+            with metrics.timer("page.extract"):
+                result = self.driver.execute_script(EXTRACT_SCRIPT)
+        slide_name, images = extract_from_script_result(result or {})
+        return slide_name, self.full_slide_urls(images)
+
+    def http_get_page(self, url: str, timer_name: str) -> Optional[requests.Response]:
+        """已同步 cookies 時以 HTTP 取得頁面，無法以 HTTP 取得時回傳 None
+
+        頁面為未登入狀態時拋出 `SessionExpiredError`：改用瀏覽器載入同樣會是未登入，
+        而且每份簡報都會各自啟動一個瀏覽器。
+        """
+        if not (self.http_fetch and self.cookies_synced):
+            return None
+        try:
+            with metrics.timer(timer_name, url=url):
+                response = self.session.get(url, timeout=30)
+                response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"以 HTTP 取得頁面失敗，改用瀏覽器：{e}")
+            return None
+        metrics.inc("page.bytes", len(response.content))
+        if self.is_login_page(response.text):
+            metrics.inc("page.session_expired")
+            raise SessionExpiredError(f"登入已過期，請重新登入：{url}")
+        return response
+
+    def driver_load(self, url: str, wait_selector: Optional[str] = None, timeout: float = 10):
+        """以瀏覽器載入頁面，呼叫端需持有 `driver_lock`
+
+        快速載入模式下 `driver.get` 在 DOM 解析完成時就會返回，
+        若指定 `wait_selector`，會再等到符合的元素出現（最多 `timeout` 秒）。
+        """
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        self.ensure_driver_session()
+        with metrics.timer("page.driver_get", url=url):
+            self.driver.get(url)
+        if self.fast_load and wait_selector:
+            with metrics.timer("page.wait", url=url):
+                try:
+                    WebDriverWait(self.driver, timeout, poll_frequency=0.05).until(
+                        expected_conditions.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
+                    )
+                except TimeoutException:
+                    pass
+
+    def discover_decks(self, course_url: str) -> List[str]:
+        """找出課程頁面上所有簡報的網址
+
+        與 `fetch_slides` 相同，先以 HTTP 取得頁面，找不到任何簡報連結時才改用瀏覽器載入。
+        """
+        response = self.http_get_page(course_url, "course.http_fetch")
+        if response is not None:
+            try:
+                decks = find_deck_links(response.text, response.url)
+            except Exception as e:
+                print(f"解析課程頁面失敗，改用瀏覽器：{e}")
+                decks = []
+            if decks:
+                metrics.inc("course.decks", len(decks))
+                return decks
+
+        metrics.inc("page.driver_fallback")
+        with self.driver_lock:
+            self.driver_load(course_url, wait_selector='a[href*="/media/doc/"]')
+            with metrics.timer("page.page_source"):
+                source = self.driver.page_source
+        decks = find_deck_links(source, course_url)
+        metrics.inc("course.decks", len(decks))
+        return decks
+
+    def get_slides(
+        self,
+        url: str,
+        status_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        archive: Optional[ArchiveSink] = None,
+    ):
+        """下載一份簡報並產生 PDF
+
+        Args:
+            url: 簡報網址
+            status_callback: 接收 `ProgressEvent` 的函式，事件的 deck_id 為簡報網址
+            archive: 指定時投影片直接寫入封存檔，不在 `slides/` 保存圖片與 PDF
+        """
+        slide_name: Optional[str] = None
+        start_time = time.monotonic()
+        downloaded_bytes = 0
+
+        def report(stage: str, message: str = "", done: int = 0, total: int = 0):
             if status_callback:
-                status_callback(f"PDF 檔案生成失敗：{slide_name}")
+                elapsed = time.monotonic() - start_time
+                status_callback(
+                    ProgressEvent(
+                        deck_id=url,
+                        stage=stage,
+                        title=slide_name or "",
+                        done=done,
+                        total=total,
+                        bytes=downloaded_bytes,
+                        throughput=downloaded_bytes / elapsed if elapsed > 0 else 0.0,
+                        message=message,
+                    )
+                )
+
+        report(Stage.RESOLVING)
+        with metrics.timer("deck.resolve", url=url):
+            slide_name, full_urls = self.fetch_slides(url)
+
+        if not slide_name:
+            metrics.inc("deck.failed")
+            report(Stage.FAILED, "無法取得簡報名稱")
             return False
 
-    def image_to_pdf(self, image_paths: List[str], output_path: str) -> bool:
+        total_slides = len(full_urls)
+        report(Stage.DOWNLOADING, f"開始下載簡報：{slide_name}", 0, total_slides)
+
+        if archive is not None:
+
+            def on_slide(index: int, size: int):
+                nonlocal downloaded_bytes
+                downloaded_bytes += size
+                report(Stage.DOWNLOADING, f"下載進度：{index + 1}/{total_slides}", index + 1, total_slides)
+
+            try:
+                self.write_to_archive(archive, url, slide_name, full_urls, on_slide)
+            except requests.RequestException:
+                raise
+            except Exception as e:
+                print(f"寫入封存檔時發生錯誤: {e}")
+                metrics.inc("deck.failed")
+                report(Stage.FAILED, f"封存檔寫入失敗：{slide_name}")
+                return False
+            metrics.inc("deck.done")
+            metrics.observe("deck.total", time.monotonic() - start_time, url=url)
+            report(Stage.DONE, f"簡報已寫入封存檔：{slide_name}", total_slides, total_slides)
+            return True
+
+        deck_dir = self.resolve_deck_dir(slide_name, url)
+        os.makedirs(deck_dir, exist_ok=True)
+
+        filenames = [image_url.split("/")[-1] for image_url in full_urls]
+        pdf_path = f"{deck_dir}/簡報.pdf"
+        tmp_pdf_path = f"{pdf_path}.part"
+
+        # 已下載過的投影片以條件式請求確認是否變更，未變更的投影片不需重新傳輸
+        manifest = DeckManifest.load(deck_dir)
+        manifest.deck_url = url
+        pdf_current = manifest.pdf_is_current(full_urls, self.export_profile.label)
+        blob_store = self.blob_store
+
+        def fetch_slide(image_url: str) -> SlideResponse:
+            # 本機有檔案可沿用，或只需要確認 PDF 是否仍為最新時，才送出條件式請求
+            if manifest.has_local_file(image_url) or (pdf_current and not self.keep_images):
+                return self.downloader.fetch_conditional(image_url, manifest.conditional_headers(image_url))
+            # 其他簡報已下載過同一張圖片時，確認未變更即可直接沿用
+            if blob_store is not None:
+                known = blob_store.lookup(image_url)
+                if known is not None:
+                    metrics.inc("slide.blob_lookup")
+                    return self.downloader.fetch_conditional(image_url, validator_headers(known))
+            return self.downloader.fetch_conditional(image_url)
+
+        def load_slide(index: int) -> bytes:
+            # 未變更的投影片優先讀取本機檔案，沒有保留檔案時才重新下載
+            image_url = full_urls[index]
+            if manifest.has_local_file(image_url):
+                with open(f"{deck_dir}/{manifest.slides[image_url]['file']}", "rb") as f:
+                    return f.read()
+            return self.downloader.fetch_bytes(image_url)
+
+        def store_slide(index: int, response: SlideResponse):
+            """將圖片保存到儲存區，並在簡報資料夾建立連結"""
+            image_url = full_urls[index]
+            path = f"{deck_dir}/{filenames[index]}"
+            if response.not_modified:
+                if manifest.has_local_file(image_url):
+                    entry = manifest.get(image_url)
+                    if not blob_store.has(entry["sha256"]):
+                        # 儲存區建立前下載的檔案，移入儲存區後改為連結
+                        with open(path, "rb") as f:
+                            blob_store.link(blob_store.put(f.read()), path)
+                else:
+                    # 沿用儲存區中的圖片（其他簡報下載過，或本簡報的檔案已被刪除）
+                    entry = blob_store.lookup(image_url)
+                    blob_store.link(entry["sha256"], path)
+                    metrics.inc("slide.blob_reused")
+                digest, size = entry["sha256"], entry["size"]
+                etag = response.etag or entry.get("etag")
+                last_modified = response.last_modified or entry.get("last_modified")
+            else:
+                digest, size = blob_store.put(response.data), len(response.data)
+                blob_store.link(digest, path)
+                etag, last_modified = response.etag, response.last_modified
+            manifest.record_digest(image_url, filenames[index], digest, size, etag, last_modified)
+            blob_store.remember(image_url, digest, size, etag, last_modified)
+
+        # 邊下載邊依序將圖片加入 PDF，最後一張下載完成時 PDF 也幾乎同時完成。
+        # PDF 已是最新時，直到出現第一張有變更的投影片才開始重新產生。
+        writer = None if pdf_current else create_pdf_writer(tmp_pdf_path, self.export_profile)
+        try:
+            for index, response in self.downloader.iter_download(full_urls, fetch=fetch_slide):
+                image_url = full_urls[index]
+                if not response.not_modified:
+                    downloaded_bytes += len(response.data)
+                    if manifest.pdf is not None:
+                        # 投影片的新紀錄寫入前先讓 PDF 紀錄失效，重新產生 PDF 前中斷時，
+                        # 下次執行即使所有投影片都回傳 304，也會重新產生 PDF
+                        manifest.invalidate_pdf()
+                        manifest.save()
+                if blob_store is not None:
+                    store_slide(index, response)
+                    # 每完成一張就更新紀錄，中斷後重新執行可以從這裡繼續
+                    manifest.save()
+                elif response.not_modified:
+                    manifest.refresh(image_url, response.etag, response.last_modified)
+                else:
+                    manifest.record(image_url, filenames[index], response.data, response.etag, response.last_modified)
+
+                if writer is None and not response.not_modified:
+                    writer = create_pdf_writer(tmp_pdf_path, self.export_profile)
+                    for earlier in range(index):
+                        writer.add_image_bytes(load_slide(earlier))
+                if writer is not None:
+                    with metrics.timer("pdf.add_page"):
+                        writer.add_image_bytes(response.data if not response.not_modified else load_slide(index))
+
+                report(Stage.DOWNLOADING, f"下載進度：{index + 1}/{total_slides}", index + 1, total_slides)
+
+            if writer is None:
+                manifest.save()
+                metrics.inc("deck.up_to_date")
+                metrics.observe("deck.total", time.monotonic() - start_time, url=url)
+                report(Stage.UP_TO_DATE, f"簡報已是最新：{slide_name}", total_slides, total_slides)
+                return True
+
+            writer.close()
+            os.replace(tmp_pdf_path, pdf_path)
+            manifest.record_pdf("簡報.pdf", full_urls, self.export_profile.label)
+            manifest.save()
+        except requests.RequestException:
+            raise
+        except Exception as e:
+            print(f"轉換 PDF 時發生錯誤: {e}")
+            metrics.inc("deck.failed")
+            report(Stage.FAILED, f"PDF 檔案生成失敗：{slide_name}")
+            return False
+        finally:
+            if writer is not None:
+                writer.abort()
+            if os.path.exists(tmp_pdf_path):
+                os.remove(tmp_pdf_path)
+            if blob_store is not None:
+                blob_store.save_index()
+
+        metrics.inc("deck.done")
+        metrics.observe("deck.total", time.monotonic() - start_time, url=url)
+        report(Stage.DONE, f"簡報下載完成：{slide_name}", total_slides, total_slides)
+        return True
+
+    def write_to_archive(
+        self,
+        archive: ArchiveSink,
+        url: str,
+        slide_name: str,
+        full_urls: List[str],
+        on_slide: Callable[[int, int], None],
+    ):
+        """依序下載投影片，輪到這份簡報時直接寫入封存檔
+
+        儲存區中已有的圖片以條件式請求確認未變更後直接讀取，但不會寫入新的圖片或紀錄。
+        `on_slide` 會收到投影片索引與實際下載的位元組數。
+        """
+        blob_store = self.blob_store
+
+        def fetch_slide(image_url: str) -> Tuple[bytes, int]:
+            known = blob_store.lookup(image_url) if blob_store is not None else None
+            response = self.downloader.fetch_conditional(image_url, validator_headers(known))
+            if response.not_modified:
+                metrics.inc("slide.blob_reused")
+                return blob_store.read(known["sha256"]), 0
+            return response.data, len(response.data)
+
+        with archive.deck(url, slide_name):
+            for index, (data, size) in self.downloader.iter_download(full_urls, fetch=fetch_slide):
+                extension = os.path.splitext(full_urls[index].split("/")[-1])[1] or ".jpg"
+                with metrics.timer("archive.add_slide"):
+                    archive.add_slide(index, data, extension)
+                on_slide(index, size)
+
+    def resolve_deck_dir(self, slide_name: str, url: str) -> str:
+        """簡報資料夾以簡報名稱命名，名稱相同但網址不同的簡報另外加上簡報編號"""
+        deck_dir = f"slides/{slide_name}"
+        owner = DeckManifest.load(deck_dir).deck_url
+        if owner is None or owner == url:
+            return deck_dir
+        return f"slides/{slide_name} ({deck_id(url) or hashlib.sha256(url.encode('utf-8')).hexdigest()[:8]})"
+
+    def image_to_pdf(
+        self,
+        image_paths: List[str],
+        output_path: str,
+        profile: Optional[ExportProfile] = None,
+    ) -> bool:
         """將多張圖片轉換為 PDF 檔案
 
+        JPEG 圖片會直接嵌入 PDF 而不重新編碼，含有其他格式時改用 reportlab 繪製。
+        指定縮圖或重新壓縮的輸出設定時，每頁以 process pool 平行處理。
+
         Args:
             image_paths: 圖片路徑列表
             output_path: 輸出的 PDF 檔案路徑
+            profile: 輸出設定，預設為 `self.export_profile`
 
         Returns:
             bool: 是否成功轉換
         """
+        profile = profile or self.export_profile
         try:
-            # 創建 PDF 文件
-            c = canvas.Canvas(output_path, pagesize=A4)
-
-            # A4 紙張尺寸（單位：點）
-            page_width, page_height = A4
-            # 設定邊距
-            margin = 40
-            # 可用區域
-            available_width = page_width - (margin * 2)
-            available_height = page_height - (margin * 2)
-
-            for image_path in image_paths:
-                # 打開圖片
-                img = Image.open(image_path)
-
-                # 獲取圖片尺寸
-                img_width, img_height = img.size
-
-                # 計算縮放比例
-                width_ratio = available_width / img_width
-                height_ratio = available_height / img_height
-                # 使用較小的比例，確保圖片完整顯示
-                scale = min(width_ratio, height_ratio)
-
-                # 計算縮放後的尺寸
-                scaled_width = img_width * scale
-                scaled_height = img_height * scale
-
-                # 計算置中位置
-                x = (page_width - scaled_width) / 2
-                y = (page_height - scaled_height) / 2
-
-                # 將圖片繪製到 PDF
-                c.drawImage(image_path, x, y, width=scaled_width, height=scaled_height)
-                c.showPage()
-
-            # 保存 PDF
-            c.save()
+            with metrics.timer("pdf.image_to_pdf", pages=len(image_paths), profile=profile.label):
+                if not profile.is_original:
+                    export_pdf(image_paths, output_path, profile)
+                    return True
+                try:
+                    write_jpeg_pdf(image_paths, output_path)
+                except NotJpegError:
+                    write_reportlab_pdf(image_paths, output_path)
             return True
 
         except Exception as e:
@@ -0,0 +1,80 @@
+import io
+import os
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from metrics import metrics
+
+if TYPE_CHECKING:
+    import ddddocr
+
+# 驗證碼辨識前的影像處理方式
+PREPROCESS_MODES = ("none", "grayscale", "threshold")
+# 二值化的門檻（0-255），低於門檻的像素視為文字
+DEFAULT_THRESHOLD = 140
+
+
+def preprocess(image: bytes, mode: str = "none", threshold: int = DEFAULT_THRESHOLD) -> bytes:
+    """依照 `mode` 將驗證碼圖片轉為灰階或黑白，回傳 PNG 內容"""
+    if mode == "none":
+        return image
+    if mode not in PREPROCESS_MODES:
+        raise ValueError(f"未知的驗證碼前處理方式：{mode}")
+
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image)) as img:
+        result = img.convert("L")
+        if mode == "threshold":
+            result = result.point(lambda value: 0 if value < threshold else 255)
+        output = io.BytesIO()
+        result.save(output, format="PNG")
+    return output.getvalue()
+
+
+class CaptchaSolver:
+    """在記憶體中辨識驗證碼，OCR 模型第一次使用時才載入，也可以提前在背景載入"""
+
+    def __init__(self, mode: str = "none", threshold: int = DEFAULT_THRESHOLD):
+        if mode not in PREPROCESS_MODES:
+            raise ValueError(f"未知的驗證碼前處理方式：{mode}")
+        self.mode = mode
+        self.threshold = threshold
+        self._ocr: Optional["ddddocr.DdddOcr"] = None
+        self.lock = threading.Lock()
+
+    @property
+    def ocr(self) -> "ddddocr.DdddOcr":
+        with self.lock:
+            if self._ocr is None:
+                with metrics.timer("ocr.load"):
+                    import ddddocr
+
+                    self._ocr = ddddocr.DdddOcr(show_ad=False)
+            return self._ocr
+
+    def warm(self) -> threading.Thread:
+        """在背景執行緒載入 OCR 模型，讓第一次登入不必等待"""
+        thread = threading.Thread(target=lambda: self.ocr, daemon=True)
+        thread.start()
+        return thread
+
+    def solve(self, image: bytes) -> str:
+        with metrics.timer("ocr.classify"):
+            return str(self.ocr.classification(preprocess(image, self.mode, self.threshold)))
+
+
+def save_captcha(captcha_dir: str, image: bytes, text: str, correct: bool):
+    """保存驗證碼圖片供離線調整使用
+
+    辨識正確的圖片以答案命名（`<答案>.png`），可以直接當作 `benchmarks/bench_captcha.py` 的語料；
+    辨識錯誤的放在 `unlabeled/`，需要人工改名為正確答案後再移到上一層。
+    """
+    folder = captcha_dir if correct else os.path.join(captcha_dir, "unlabeled")
+    os.makedirs(folder, exist_ok=True)
+    name = re.sub(r"[^0-9A-Za-z]", "", text) or "empty"
+    path = os.path.join(folder, f"{name}.png" if correct else f"{name}_{int(time.time() * 1000)}.png")
+    with open(path, "wb") as f:
+        f.write(image)
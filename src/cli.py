@@ -0,0 +1,289 @@
+"""iLearning PPT 下載器的命令列批次模式
+
+不啟動 NiceGUI，以 headless 瀏覽器登入後依序下載所有簡報，適合排程執行。
+帳號密碼從環境變數 NCHU_ACCOUNT / NCHU_PASSWORD 讀取（也會讀取目前目錄的 .env）。
+
+使用方式：
+    python src/cli.py https://lms2020.nchu.edu.tw/media/doc/12345
+    python src/cli.py --file urls.txt --pdf-only
+    python src/cli.py --course https://lms2020.nchu.edu.tw/course/12345
+    python src/cli.py --file urls.txt --archive 期中考.pdf  # 合併為一份有書籤的 PDF
+
+追蹤與同步：
+    python src/cli.py --watch --course https://lms2020.nchu.edu.tw/course/12345
+    python src/cli.py --sync                  # 同步一次，只下載有變更的簡報
+    python src/cli.py --sync --interval 3600  # 每小時同步一次，直到中斷
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from archive import ARCHIVE_FORMATS, ArchiveSink, create_archive
+from captcha import PREPROCESS_MODES
+from crawler import DEFAULT_RATE_LIMIT, CrawlScheduler, HostRateLimiter
+from export import PROFILES, get_profile
+from sync import DeckSyncer, SyncState
+
+DEFAULT_LOGIN_URL = "https://lms2020.nchu.edu.tw/"
+
+
+def read_urls(urls: List[str], file: Optional[str]) -> List[str]:
+    """合併命令列與檔案中的網址，檔案中的空白行與 # 開頭的註解會被略過"""
+    result = list(urls)
+    if file:
+        stream = sys.stdin if file == "-" else open(file, "r", encoding="utf-8")
+        with stream:
+            result.extend(line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#"))
+    # 重複的網址只下載一次
+    return list(dict.fromkeys(result))
+
+
+def setup_logging():
+    os.makedirs("log", exist_ok=True)
+    logging.basicConfig(
+        filename=os.path.join("log", f"ilearning_ppt_downloader_{datetime.now().strftime('%Y%m%d')}.log"),
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+
+def load_credentials():
+    # python-dotenv 只在環境變數沒有帳密時才載入
+    if not (os.environ.get("NCHU_ACCOUNT") and os.environ.get("NCHU_PASSWORD")):
+        try:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+        except ImportError:
+            pass
+    return os.environ.get("NCHU_ACCOUNT", ""), os.environ.get("NCHU_PASSWORD", "")
+
+
+def print_progress(event):
+    from progress import Stage, format_bytes
+
+    # 下載中的逐張進度不逐行輸出，只顯示開始與結束
+    if event.stage == Stage.DOWNLOADING and event.done:
+        return
+    line = f"[{Stage.LABELS.get(event.stage, event.stage)}] {event.title or event.deck_id}"
+    if event.total:
+        line += f" {event.done}/{event.total}"
+    if event.bytes:
+        line += f"，{format_bytes(event.bytes)}（{format_bytes(event.throughput)}/s）"
+    if event.stage == Stage.FAILED and event.message:
+        line += f"：{event.message}"
+    print(line, flush=True)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="*", help="簡報網址")
+    parser.add_argument("-f", "--file", help="每行一個簡報網址的檔案，- 代表標準輸入")
+    parser.add_argument(
+        "-c", "--course", action="append", default=[], help="課程頁面網址，下載頁面上所有的簡報，可重複指定"
+    )
+    parser.add_argument("--login-url", default=DEFAULT_LOGIN_URL, help="iLearning 網站網址")
+    parser.add_argument("--workers", type=int, default=8, help="每份簡報同時下載的圖片數量")
+    parser.add_argument("--decks", type=int, default=2, help="同時下載的簡報數量")
+    parser.add_argument(
+        "--rate", type=float, default=DEFAULT_RATE_LIMIT, help="每個主機每秒最多送出的請求數，0 代表不限制"
+    )
+    parser.add_argument(
+        "--profile", choices=PROFILES, default="original", help="PDF 輸出設定：原始圖片、150 DPI 或 96 DPI"
+    )
+    parser.add_argument("--grayscale", action="store_true", help="以灰階輸出 PDF")
+    parser.add_argument("--pdf-only", action="store_true", help="只產生 PDF，不保留每張投影片的圖片")
+    parser.add_argument(
+        "--archive",
+        metavar="PATH",
+        help=f"將所有簡報直接寫入一個封存檔（{'、'.join(ARCHIVE_FORMATS)}），不保存個別的圖片與 PDF",
+    )
+    parser.add_argument(
+        "--fast-load", action="store_true", help="瀏覽器不等待整頁載入，登入後也不載入圖片、影音、字型與樣式表"
+    )
+    parser.add_argument("--login-attempts", type=int, default=3, help="驗證碼辨識錯誤時自動重新登入的次數上限")
+    parser.add_argument(
+        "--captcha-preprocess", choices=PREPROCESS_MODES, default="none", help="驗證碼辨識前的影像處理方式"
+    )
+    parser.add_argument("--save-captchas", metavar="DIR", help="保存驗證碼圖片，供 benchmarks/bench_captcha.py 使用")
+    parser.add_argument("--show-browser", action="store_true", help="需要瀏覽器時顯示視窗（預設為 headless）")
+    parser.add_argument("--watch", action="store_true", help="將網址與課程加入追蹤清單後結束，不下載")
+    parser.add_argument("--unwatch", action="store_true", help="將網址與課程從追蹤清單移除後結束")
+    parser.add_argument("--list-watch", action="store_true", help="列出追蹤清單與上次同步的狀態後結束")
+    parser.add_argument("--sync", action="store_true", help="檢查追蹤清單，只下載有變更的簡報")
+    parser.add_argument("--interval", type=float, default=0, help="搭配 --sync，每隔指定秒數重新同步，0 代表只同步一次")
+    parser.add_argument("--sync-state", default="local/sync.json", help="追蹤清單與同步狀態的檔案")
+    args = parser.parse_args(argv)
+    if args.archive and os.path.splitext(args.archive)[1].lower() not in ARCHIVE_FORMATS:
+        parser.error(f"--archive 的副檔名必須是 {'、'.join(ARCHIVE_FORMATS)}")
+    if args.archive and args.sync:
+        parser.error("--archive 不能與 --sync 一起使用")
+    return args
+
+
+def manage_watch_list(args: argparse.Namespace, urls: List[str]) -> int:
+    """處理 --watch / --unwatch / --list-watch，不需要登入"""
+    state = SyncState.load(args.sync_state)
+    targets = urls + args.course
+    if args.watch or args.unwatch:
+        if not targets:
+            print("請提供至少一個簡報或課程網址", file=sys.stderr)
+            return 2
+        if args.watch:
+            print(f"新增 {state.add(targets)} 個追蹤項目，共 {len(state.watch)} 個")
+        else:
+            print(f"移除 {state.remove(targets)} 個追蹤項目，共 {len(state.watch)} 個")
+        state.save()
+        return 0
+
+    for url in state.watch:
+        print(url)
+        for deck_url in state.courses.get(url, [url]):
+            entry = state.decks.get(deck_url)
+            if entry is None:
+                print(f"  {deck_url}：尚未同步")
+                continue
+            synced = datetime.fromtimestamp(entry.get("synced_at", entry["checked_at"])).strftime("%Y-%m-%d %H:%M")
+            print(f"  {entry.get('title') or deck_url}：{entry.get('count', 0)} 張，上次更新 {synced}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    urls = read_urls(args.urls, args.file)
+    if args.watch or args.unwatch or args.list_watch:
+        return manage_watch_list(args, urls)
+    if args.sync:
+        if not SyncState.load(args.sync_state).watch:
+            print("追蹤清單是空的，請先以 --watch 加入簡報或課程網址", file=sys.stderr)
+            return 2
+    elif not urls and not args.course:
+        print("請提供至少一個簡報或課程網址", file=sys.stderr)
+        return 2
+
+    account, password = load_credentials()
+    if not account or not password:
+        print("請設定環境變數 NCHU_ACCOUNT 與 NCHU_PASSWORD", file=sys.stderr)
+        return 2
+
+    setup_logging()
+
+    from browser import Browser
+    from metrics import metrics, metrics_log_path
+
+    metrics.configure(metrics_log_path(), worker="cli")
+    browser = Browser(
+        headless=not args.show_browser,
+        login_url=args.login_url,
+        max_workers=args.workers,
+        keep_images=not args.pdf_only,
+        rate_limiter=HostRateLimiter(args.rate),
+        fast_load=args.fast_load,
+        captcha_preprocess=args.captcha_preprocess,
+        max_login_attempts=args.login_attempts,
+        captcha_dir=args.save_captchas,
+        export_profile=get_profile(args.profile, args.grayscale),
+    )
+
+    try:
+        logging.info(f"CLI logging in with account: {account} at {args.login_url}")
+        if not browser.login(account, password):
+            print("登入失敗", file=sys.stderr)
+            return 1
+
+        if args.sync:
+            return run_sync(browser, args, download_to(browser, None), lambda: browser.login(account, password))
+
+        archive = create_archive(args.archive, browser.export_profile) if args.archive else None
+        try:
+            results = download_all(browser, args, urls, download_to(browser, archive), archive)
+        except BaseException:
+            if archive is not None:
+                archive.abort()
+            raise
+        if archive is not None and archive.close():
+            print(f"已寫入封存檔：{args.archive}")
+        if results is None:
+            return 1
+        failures = sum(not ok for ok in results.values())
+        print(f"完成 {len(results) - failures} 份簡報，失敗 {failures} 份")
+        return 1 if failures else 0
+    finally:
+        if browser.driver_started:
+            browser.driver.quit()
+
+
+def download_to(browser, archive):
+    """下載一份簡報的函式，`archive` 不為 None 時寫入封存檔"""
+
+    def download(url: str) -> bool:
+        logging.info(f"CLI processing slides at URL: {url}")
+        try:
+            return browser.get_slides(url, print_progress, archive)
+        except Exception as e:
+            logging.error(f"Error during slides download: {str(e)}")
+            print(f"[下載失敗] {url}：{e}", flush=True)
+            return False
+        finally:
+            # 沒有寫入封存檔就結束的簡報也要讓出順序，後面的簡報才能繼續寫入
+            if archive is not None:
+                archive.release(url)
+
+    return download
+
+
+def download_all(
+    browser,
+    args: argparse.Namespace,
+    urls: List[str],
+    download,
+    archive: Optional[ArchiveSink] = None,
+) -> Optional[Dict[str, bool]]:
+    """下載所有網址與課程頁面上的簡報，讀取課程頁面失敗時回傳 None
+
+    指定 `archive` 時依排入的順序預留封存檔中的寫入順序。
+    """
+    scheduler = CrawlScheduler(download, concurrency=args.decks)
+    scheduler.add_all(urls)
+    for course_url in args.course:
+        logging.info(f"CLI discovering decks at course URL: {course_url}")
+        try:
+            decks = browser.discover_decks(course_url)
+        except Exception as e:
+            logging.error(f"Error during deck discovery: {str(e)}")
+            print(f"[讀取課程失敗] {course_url}：{e}", file=sys.stderr)
+            return None
+        added = scheduler.add_all(decks)
+        print(f"[課程] {course_url}：找到 {len(decks)} 份簡報，新增 {added} 份", flush=True)
+    if archive is not None:
+        archive.reserve(scheduler.queue)
+    return scheduler.run()
+
+
+def run_sync(browser, args: argparse.Namespace, download, relogin) -> int:
+    """同步追蹤清單，指定 --interval 時持續執行直到中斷"""
+    syncer = DeckSyncer(browser, SyncState.load(args.sync_state))
+    while True:
+        started = time.monotonic()
+        results = syncer.sync_once(download, relogin)
+        failures = sum(not ok for ok in results.values())
+        print(
+            f"[同步] {datetime.now().strftime('%H:%M:%S')} 更新 {len(results) - failures} 份簡報，失敗 {failures} 份",
+            flush=True,
+        )
+        if args.interval <= 0:
+            return 1 if failures else 0
+        try:
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class LoginCommand:
+    """以帳號密碼登入 iLearning"""
+
+    login_url: str
+    account: str
+    password: str
+
+
+@dataclass
+class DownloadCommand:
+    """下載多份簡報"""
+
+    urls: List[str] = field(default_factory=list)
+
+
+@dataclass
+class WatchCommand:
+    """將簡報或課程網址加入追蹤清單，`remove` 為 True 時改為移除"""
+
+    urls: List[str] = field(default_factory=list)
+    remove: bool = False
+
+
+@dataclass
+class SyncCommand:
+    """立即同步追蹤清單，只下載有變更的簡報"""
+
+
+@dataclass
+class SyncResultCommand:
+    """下載 worker 回報同步工作的結果，下載成功後才記錄該簡報的同步狀態"""
+
+    url: str
+    success: bool
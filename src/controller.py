@@ -0,0 +1,187 @@
+import random
+import threading
+import time
+from typing import Callable, Mapping, Optional, TypeVar
+
+import requests
+
+from metrics import metrics
+
+T = TypeVar("T")
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+
+# 這些狀態碼代表伺服器暫時無法處理，稍後重試可能成功
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# 各執行緒在本機速率限制上累計等待的秒數，由 `downloader.RateLimitedAdapter` 記錄
+throttle = threading.local()
+
+
+def record_throttle_wait(seconds: float):
+    throttle.waited = throttle_waited() + seconds
+
+
+def throttle_waited() -> float:
+    return getattr(throttle, "waited", 0.0)
+
+
+class InvalidResponseError(requests.RequestException):
+    """回應內容不完整或不是預期的格式（例如被截斷的 JPEG）"""
+
+
+def validate_slide(size: int, head: bytes, tail: bytes, headers: Mapping[str, str]):
+    """檢查下載的圖片是否完整
+
+    Args:
+        size: 實際收到的位元組數
+        head: 內容開頭的位元組，用來判斷是否為 JPEG
+        tail: 內容結尾的位元組，JPEG 必須以 EOI 標記結尾
+        headers: 回應標頭，有 Content-Length 且未壓縮傳輸時長度必須一致
+    """
+    content_length = headers.get("Content-Length")
+    if content_length and not headers.get("Content-Encoding") and content_length.isdigit():
+        if int(content_length) != size:
+            raise InvalidResponseError(f"回應長度 {size} 與 Content-Length {content_length} 不符")
+    if not size:
+        raise InvalidResponseError("回應內容為空")
+    if head.startswith(JPEG_SOI) and not tail.rstrip(b"\x00\r\n").endswith(JPEG_EOI):
+        raise InvalidResponseError("JPEG 缺少結尾標記，內容可能被截斷")
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUS
+    retryable = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+    return isinstance(error, (*retryable, InvalidResponseError))
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """429 / 503 回應的 Retry-After 秒數"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+class AIMDLimiter:
+    """依照延遲與錯誤自動調整同時進行的請求數量
+
+    每次成功且延遲沒有明顯升高時，上限每一輪約增加 1（加法增加）；
+    發生錯誤或延遲超過基準的 `latency_tolerance` 倍時，上限減半（乘法減少），
+    並在 `cooldown` 秒內不再重複減少，避免同一波壅塞被計算多次。
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 16,
+        backoff: float = 0.5,
+        latency_tolerance: float = 3.0,
+        cooldown: float = 1.0,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        # 觀察到的最低延遲，作為未壅塞時的基準
+        self.base_latency: Optional[float] = None
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, success: bool, latency: Optional[float] = None):
+        with self.condition:
+            self.in_flight -= 1
+            if latency is not None and success:
+                self.base_latency = latency if self.base_latency is None else min(self.base_latency, latency)
+
+            congested = not success or (
+                latency is not None
+                and self.base_latency is not None
+                and latency > self.base_latency * self.latency_tolerance
+            )
+            previous = int(self.limit)
+            if congested:
+                now = time.monotonic()
+                if now - self.last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self.last_decrease = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+            limit = int(self.limit)
+            self.condition.notify_all()
+        # 寫入檔案時不持有 condition，等待中的 acquire 不會被磁碟 I/O 阻塞
+        if limit != previous:
+            metrics.write_record({"type": "concurrency", "limit": limit})
+
+
+class RequestController:
+    """對單一請求套用同時數量限制、驗證失敗時以 jittered exponential backoff 重試
+
+    `request` 應在回應不正確時拋出 `requests.RequestException`（例如 `raise_for_status()`
+    或 `InvalidResponseError`），可重試的錯誤會在等待後重新呼叫，不可重試的錯誤直接拋出。
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[AIMDLimiter] = None,
+        attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+    ):
+        self.limiter = limiter
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff_delay(self, attempt: int) -> float:
+        """第 `attempt` 次重試前的等待秒數（full jitter）"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def call(self, request: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.limiter.acquire()
+            start = time.perf_counter()
+            waited = throttle_waited()
+            try:
+                result = request()
+            except requests.RequestException as e:
+                retryable = is_retryable(e)
+                if self.limiter:
+                    # 只有伺服器壅塞或傳輸失敗才降低同時數量，404 之類的錯誤與負載無關
+                    self.limiter.release(success=not retryable)
+                if isinstance(e, InvalidResponseError):
+                    metrics.inc("slide.invalid")
+                attempt += 1
+                if attempt >= self.attempts or not retryable:
+                    raise
+                metrics.inc("slide.retries")
+                delay = retry_after(e)
+                time.sleep(min(self.max_delay, delay) if delay is not None else self.backoff_delay(attempt - 1))
+                continue
+            except BaseException:
+                if self.limiter:
+                    self.limiter.release(success=True)
+                raise
+            if self.limiter:
+                # 等待本機速率限制的時間不是伺服器壅塞，不計入延遲
+                latency = time.perf_counter() - start - (throttle_waited() - waited)
+                self.limiter.release(success=True, latency=max(0.0, latency))
+            return result
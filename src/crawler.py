@@ -0,0 +1,163 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+# 簡報網址的格式：/media/doc/<id>
+DECK_PATH_PATTERN = re.compile(r"/media/doc/(\d+)")
+
+# 預設每個主機每秒最多送出的請求數，0 代表不限制
+DEFAULT_RATE_LIMIT = 20.0
+
+
+class TokenBucket:
+    """令牌桶：平均每秒補充 `rate` 個令牌，最多累積 `burst` 個"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """取得一個令牌，令牌不足時阻塞直到補充完成"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """每個主機各自一個令牌桶，所有共用此物件的請求一起受到限制"""
+
+    def __init__(self, rate: float = DEFAULT_RATE_LIMIT, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url: str):
+        if self.rate <= 0:
+            return
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            bucket = self.buckets[host]
+        bucket.acquire()
+
+
+def deck_id(url: str) -> Optional[str]:
+    match = DECK_PATH_PATTERN.search(urlsplit(url).path)
+    return match.group(1) if match else None
+
+
+def normalize_deck_url(url: str) -> Optional[str]:
+    """將簡報連結統一為 `<scheme>://<host>/media/doc/<id>`，不是簡報連結時回傳 None"""
+    parts = urlsplit(url)
+    match = DECK_PATH_PATTERN.search(parts.path)
+    if not match or parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}/media/doc/{match.group(1)}"
+
+
+class LinkParser(HTMLParser):
+    """只收集 `<a href>`，不建立完整的 DOM"""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        for name, value in attrs:
+            if name == "href" and value:
+                self.hrefs.append(value)
+
+
+def find_deck_links(source: str, base_url: str) -> List[str]:
+    """從課程頁面原始碼找出所有簡報連結，依出現順序排列並移除重複的簡報"""
+    parser = LinkParser()
+    parser.feed(source)
+    parser.close()
+
+    decks: Dict[str, str] = {}
+    for href in parser.hrefs:
+        url = normalize_deck_url(urljoin(base_url, href))
+        if url:
+            decks.setdefault(deck_id(url) or url, url)
+    return list(decks.values())
+
+
+class DeckQueue:
+    """依加入順序記錄待下載的簡報
+
+    相同網址或相同簡報編號只會排入一次，即使來自不同的課程頁面。
+    """
+
+    def __init__(self):
+        self.seen_urls: set = set()
+        self.seen_ids: set = set()
+        self.queue: List[str] = []
+
+    def add(self, url: str) -> bool:
+        """排入一份簡報，已經排入過時回傳 False"""
+        normalized = normalize_deck_url(url) or url
+        identifier = deck_id(normalized)
+        if normalized in self.seen_urls or (identifier and identifier in self.seen_ids):
+            return False
+        self.seen_urls.add(normalized)
+        if identifier:
+            self.seen_ids.add(identifier)
+        self.queue.append(normalized)
+        return True
+
+    def add_all(self, urls: List[str]) -> int:
+        """排入多份簡報，回傳實際新增的數量"""
+        return sum(self.add(url) for url in urls)
+
+    def pop_all(self) -> List[str]:
+        queue, self.queue = self.queue, []
+        return queue
+
+
+class CrawlScheduler(DeckQueue):
+    """以有限的同時數量下載所有排入的簡報"""
+
+    def __init__(self, download: Callable[[str], bool], concurrency: int = 2):
+        super().__init__()
+        self.download = download
+        self.concurrency = max(1, concurrency)
+
+    def run(self) -> Dict[str, bool]:
+        """下載所有已排入的簡報
+
+        Returns:
+            Dict[str, bool]: 每份簡報網址對應的下載結果
+        """
+        queue = self.pop_all()
+        results: Dict[str, bool] = {}
+
+        def run_one(url: str):
+            try:
+                results[url] = bool(self.download(url))
+            except Exception as e:
+                print(f"下載簡報時發生錯誤：{url}：{e}")
+                results[url] = False
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(run_one, queue))
+        return results
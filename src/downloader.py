@@ -0,0 +1,155 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from controller import AIMDLimiter, RequestController, record_throttle_wait, validate_slide
+from metrics import metrics
+
+# 連線與讀取逾時（秒）
+DEFAULT_TIMEOUT = (10, 60)
+
+
+@dataclass
+class SlideResponse:
+    """條件式請求的結果，伺服器回傳 304 時 `data` 為 None"""
+
+    data: Optional[bytes]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.data is None
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """每次送出請求前先向 `rate_limiter` 取得令牌，讓同一個 session 的所有請求共用速率限制
+
+    等待令牌的時間會記錄下來，`RequestController` 計算延遲時會扣除，不會被當成伺服器壅塞。
+    """
+
+    def __init__(self, rate_limiter=None, **kwargs):
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.rate_limiter is not None:
+            start = time.perf_counter()
+            self.rate_limiter.acquire(request.url)
+            record_throttle_wait(time.perf_counter() - start)
+        return super().send(request, **kwargs)
+
+
+class SlideDownloader:
+    """以固定數量的執行緒同時下載多張投影片圖片
+
+    所有執行緒共用同一個 `requests.Session`，並依照 worker 數量調整連線池大小，
+    `iter_download` 依投影片順序逐張產出內容，尚未產出的圖片最多只有下載視窗內的數量。
+    指定 `rate_limiter`（例如 `crawler.HostRateLimiter`）時，session 的所有請求都會受其限制。
+
+    每個請求都經過 `controller`：回應會檢查狀態碼、Content-Length 與 JPEG 結尾標記，
+    暫時性的錯誤會自動重試，同時進行的請求數量則依延遲與錯誤率在 1 到 `max_workers` 之間調整。
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        max_workers: int = 8,
+        chunk_size: int = 64 * 1024,
+        rate_limiter=None,
+        controller: Optional[RequestController] = None,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.session = session
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        # 從一半的 worker 數量開始，依伺服器的回應逐步增加
+        self.controller = controller or RequestController(
+            AIMDLimiter(initial=max(1, self.max_workers // 2), maximum=self.max_workers)
+        )
+
+        # 連線池大小與 worker 數量一致，避免連線被丟棄後重新建立
+        adapter = RateLimitedAdapter(rate_limiter, pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def read_slide(self, response: requests.Response) -> bytes:
+        """讀取完整的回應內容並確認圖片沒有被截斷"""
+        data = b"".join(response.iter_content(chunk_size=self.chunk_size))
+        validate_slide(len(data), data[:2], data[-16:], response.headers)
+        return data
+
+    def fetch_bytes(self, url: str) -> bytes:
+        """下載單張圖片並回傳其內容"""
+
+        def request() -> bytes:
+            with metrics.timer("slide.fetch", url=url):
+                with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                    metrics.inc("slide.requests")
+                    response.raise_for_status()
+                    return self.read_slide(response)
+
+        data = self.controller.call(request)
+        metrics.inc("slide.bytes", len(data))
+        return data
+
+    def fetch_conditional(self, url: str, headers: Optional[Dict[str, str]] = None) -> SlideResponse:
+        """帶上 If-None-Match / If-Modified-Since 下載圖片，未變更時不傳輸內容"""
+
+        def request() -> SlideResponse:
+            with metrics.timer("slide.fetch", url=url):
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    metrics.inc("slide.requests")
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if response.status_code == 304:
+                        metrics.inc("slide.not_modified")
+                        return SlideResponse(None, etag, last_modified)
+                    response.raise_for_status()
+                    return SlideResponse(self.read_slide(response), etag, last_modified)
+
+        result = self.controller.call(request)
+        if result.data is not None:
+            metrics.inc("slide.bytes", len(result.data))
+        return result
+
+    def iter_download(
+        self,
+        urls: List[str],
+        window: Optional[int] = None,
+        fetch: Optional[Callable[[str], Any]] = None,
+    ) -> Iterator[Tuple[int, Any]]:
+        """同時下載所有圖片，並依投影片順序逐張產出內容
+
+        只有在前面的圖片都已產出後，才會開始下載距離目前位置 `window` 張以外的圖片，
+        因此尚未產出的圖片內容最多只有 `window` 張，記憶體用量不隨簡報頁數增加。
+
+        Args:
+            urls: 圖片網址列表
+            window: 重新排序緩衝區的大小，預設為 worker 數量的兩倍
+            fetch: 下載單一網址的函式，預設為 `fetch_bytes`
+
+        Yields:
+            Tuple[int, Any]: (投影片索引, `fetch` 的回傳值)
+        """
+        window = max(1, window or self.max_workers * 2)
+        fetch = fetch or self.fetch_bytes
+        total = len(urls)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures: Dict[int, Future] = {}
+            next_index = 0
+            try:
+                for index in range(total):
+                    while next_index < total and next_index < index + window:
+                        futures[next_index] = executor.submit(fetch, urls[next_index])
+                        next_index += 1
+                    yield index, futures.pop(index).result()
+            finally:
+                for future in futures.values():
+                    future.cancel()
@@ -0,0 +1,166 @@
+"""從簡報頁面只取出需要的欄位：`.title` 的文字與每個 `.slide` 中第一張 `<img>` 的 src
+
+`has_link_text` 以同樣的方式找出文字完全相符的連結，用來判斷頁面是否為未登入狀態。
+不建立完整的 DOM：有安裝 lxml 時以 XPath 直接查詢，否則以標準函式庫的 HTMLParser
+邊解析邊收集；由瀏覽器載入的頁面則以 `EXTRACT_SCRIPT` 在瀏覽器內取得，不必序列化整份 DOM。
+"""
+
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# 在瀏覽器中執行，回傳與 `extract_slides` 相同的欄位
+EXTRACT_SCRIPT = """
+const title = document.querySelector('.title');
+const images = [];
+for (const slide of document.querySelectorAll('.slide')) {
+    const img = slide.querySelector('img');
+    if (img && img.getAttribute('src')) images.push(img.getAttribute('src'));
+}
+return {title: title ? title.textContent : null, images: images};
+"""
+
+# HTML 中沒有結束標籤的元素，不放入開啟中的標籤堆疊
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}  # fmt: skip
+
+
+def has_class(attrs: List[Tuple[str, Optional[str]]], name: str) -> bool:
+    return any(key == "class" and value and name in value.split() for key, value in attrs)
+
+
+class SlidePageParser(HTMLParser):
+    """只追蹤 `.title` 與 `.slide` 所在的元素，其餘標籤直接略過
+
+    以開啟中的標籤堆疊判斷元素範圍，結束標籤會關閉其內所有未關閉的標籤，
+    缺少結束標籤的 HTML（例如 `<p>`、`<li>`）不會讓範圍錯位。
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # (標籤名稱, 是否為 .title, 是否為 .slide)
+        self.stack: List[Tuple[str, bool, bool]] = []
+        self.title_parts: List[str] = []
+        self.title_found = False
+        self.in_title = False
+        self.in_slide = False
+        self.slide_has_image = False
+        self.images: List[str] = []
+
+    @property
+    def title(self) -> Optional[str]:
+        return "".join(self.title_parts) if self.title_found else None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "img" and self.in_slide and not self.slide_has_image:
+            src = dict(attrs).get("src")
+            if src:
+                self.images.append(src)
+                self.slide_has_image = True
+        if tag in VOID_ELEMENTS:
+            return
+
+        is_title = not self.title_found and has_class(attrs, "title")
+        is_slide = not self.in_slide and has_class(attrs, "slide")
+        if is_title:
+            self.title_found = self.in_title = True
+        if is_slide:
+            self.in_slide = True
+            self.slide_has_image = False
+        self.stack.append((tag, is_title, is_slide))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if not any(name == tag for name, _, _ in self.stack):
+            return
+        while self.stack:
+            name, is_title, is_slide = self.stack.pop()
+            if is_title:
+                self.in_title = False
+            if is_slide:
+                self.in_slide = False
+            if name == tag:
+                return
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title_parts.append(data)
+
+
+def extract_with_parser(source: str) -> Tuple[Optional[str], List[str]]:
+    parser = SlidePageParser()
+    parser.feed(source)
+    parser.close()
+    return parser.title, parser.images
+
+
+def extract_with_lxml(source: str) -> Tuple[Optional[str], List[str]]:
+    document = lxml_html.fromstring(source)
+    slide_class = "contains(concat(' ', normalize-space(@class), ' '), ' slide ')"
+    images = [str(src) for src in document.xpath(f"//*[{slide_class}]/descendant::img[1]/@src") if src]
+    titles = document.xpath("(//*[contains(concat(' ', normalize-space(@class), ' '), ' title ')])[1]")
+    return (titles[0].text_content() if titles else None), images
+
+
+class LinkTextParser(HTMLParser):
+    """收集每個 `<a>` 的文字（包含其中的子元素），與 Selenium 的 LINK_TEXT 相同以去除多餘空白後的文字比對"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.depth = 0
+        self.parts: List[str] = []
+        self.texts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        if self.depth == 0:
+            self.parts = []
+        self.depth += 1
+
+    def handle_endtag(self, tag):
+        if tag != "a" or self.depth == 0:
+            return
+        self.depth -= 1
+        if self.depth == 0:
+            self.texts.append(" ".join("".join(self.parts).split()))
+
+    def handle_data(self, data):
+        if self.depth:
+            self.parts.append(data)
+
+
+def has_link_text(source: str, text: str) -> bool:
+    """頁面上是否有文字為 `text` 的連結"""
+    if lxml_html is not None and source.strip():
+        document = lxml_html.fromstring(source)
+        return bool(document.xpath("//a[normalize-space(.) = $text]", text=text))
+    parser = LinkTextParser()
+    parser.feed(source)
+    parser.close()
+    return text in parser.texts
+
+
+def extract_slides(source: str) -> Tuple[Optional[str], List[str]]:
+    """取出簡報名稱與投影片圖片的 src
+
+    Returns:
+        Tuple[Optional[str], List[str]]: 去除前後空白的簡報名稱（找不到時為 None）與圖片 src 列表
+    """
+    title, images = extract_with_lxml(source) if lxml_html is not None else extract_with_parser(source)
+    return (title.strip() if title is not None else None), images
+
+
+def extract_from_script_result(result: Dict[str, Any]) -> Tuple[Optional[str], List[str]]:
+    """整理 `EXTRACT_SCRIPT` 的回傳值"""
+    title = result.get("title")
+    return (title.strip() if title is not None else None), list(result.get("images") or [])
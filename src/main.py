@@ -8,11 +8,15 @@ import time
 from datetime import datetime
 from multiprocessing import Process, Queue
 from queue import Empty
-from typing import List
+from typing import Any, Dict, List, Tuple
 
-from nicegui import ui
-
-from browser import Browser
+from browser import Browser, SessionExpiredError
+from commands import DownloadCommand, LoginCommand, SyncCommand, SyncResultCommand, WatchCommand
+from crawler import DEFAULT_RATE_LIMIT, DeckQueue, HostRateLimiter, deck_id
+from export import ExportProfile, get_profile
+from metrics import merge_snapshots, metrics, metrics_log_path, start_metrics_server
+from progress import MetricsEvent, ProgressEvent, Stage, StatusEvent, drain_events, format_bytes
+from sync import DeckCheck, DeckSyncer, SyncState
 
 # 創建 log 資料夾（如果不存在）
 os.makedirs("log", exist_ok=True)
@@ -29,6 +33,60 @@ logging.basicConfig(
 )
 
 
+# 狀態訊息中代表登入與分派行程的編號，下載 worker 從 1 開始編號
+COORDINATOR_ID = 0
+# 檢查瀏覽器是否仍在執行的間隔（秒）
+LIVENESS_CHECK_INTERVAL = 2.0
+
+
+def get_metrics_port() -> int:
+    """metrics 端點的埠號，可透過環境變數 ILEARNING_METRICS_PORT 設定，預設為隨機可用的埠號"""
+    try:
+        return int(os.environ.get("ILEARNING_METRICS_PORT", "0"))
+    except ValueError:
+        return 0
+
+
+def get_worker_count() -> int:
+    """下載 worker 行程數量，可透過環境變數 ILEARNING_WORKERS 設定"""
+    try:
+        return max(1, int(os.environ.get("ILEARNING_WORKERS", "2")))
+    except ValueError:
+        return 2
+
+
+def get_rate_limit() -> float:
+    """每個主機每秒最多送出的請求數，可透過環境變數 ILEARNING_RATE_LIMIT 設定，0 代表不限制"""
+    try:
+        return max(0.0, float(os.environ.get("ILEARNING_RATE_LIMIT", DEFAULT_RATE_LIMIT)))
+    except ValueError:
+        return DEFAULT_RATE_LIMIT
+
+
+def get_fast_load() -> bool:
+    """是否使用快速載入的瀏覽器設定，可透過環境變數 ILEARNING_FAST_LOAD=1 開啟"""
+    return os.environ.get("ILEARNING_FAST_LOAD", "").strip().lower() in ("1", "true", "yes")
+
+
+def get_export_profile() -> ExportProfile:
+    """PDF 輸出設定，可透過環境變數 ILEARNING_EXPORT_PROFILE（original、150dpi、96dpi）
+    與 ILEARNING_GRAYSCALE=1 設定"""
+    grayscale = os.environ.get("ILEARNING_GRAYSCALE", "").strip().lower() in ("1", "true", "yes")
+    try:
+        return get_profile(os.environ.get("ILEARNING_EXPORT_PROFILE", "original").strip(), grayscale)
+    except ValueError as e:
+        logging.error(str(e))
+        return get_profile("original", grayscale)
+
+
+def get_sync_interval() -> float:
+    """自動同步追蹤清單的間隔（秒），可透過環境變數 ILEARNING_SYNC_INTERVAL 設定，0 代表不自動同步"""
+    try:
+        return max(0.0, float(os.environ.get("ILEARNING_SYNC_INTERVAL", "0")))
+    except ValueError:
+        return 0.0
+
+
 def find_free_port():
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.bind(("", 0))
@@ -37,9 +95,18 @@ def find_free_port():
     return port
 
 
-def run_nicegui(command_queue: Queue, credentials_queue: Queue, status_queue: Queue):
+def run_nicegui(command_queue: Queue, status_queue: Queue):
+    # NiceGUI 只有介面行程需要，下載 worker 以 spawn 啟動時不必載入
+    from nicegui import ui
+
     ui.label("iLearning PPT 下載器").classes("text-h3 font-bold")
 
+    # 各行程最新的 metrics snapshot，合併後提供給統計卡片與 metrics 端點
+    process_metrics: Dict[int, Dict[str, Any]] = {}
+    metrics_server = start_metrics_server(lambda: merge_snapshots(list(process_metrics.values())), get_metrics_port())
+    metrics_url = f"http://127.0.0.1:{metrics_server.server_address[1]}/metrics"
+    logging.info(f"Metrics endpoint: {metrics_url}")
+
     @ui.page("/")
     def main_page():
         with ui.grid(columns=2).classes("gap-4 w-full"):
@@ -67,9 +134,28 @@ def run_nicegui(command_queue: Queue, credentials_queue: Queue, status_queue: Qu
                         )
                         ui.button(
                             "登入",
-                            on_click=lambda: credentials_queue.put((login_url.value, account.value, password.value)),
+                            on_click=lambda: command_queue.put(
+                                LoginCommand(login_url.value, account.value, password.value)
+                            ),
                         )
 
+                # 效能統計
+                with ui.card().classes("w-full"):
+                    ui.label("效能統計").classes("text-h6")
+                    ui.link(metrics_url, metrics_url, new_tab=True).classes("text-sm")
+                    stats_label = ui.label("尚無資料").classes("text-body2 whitespace-pre-line")
+                    stats_table = ui.table(
+                        columns=[
+                            {"name": "stage", "label": "階段", "field": "stage", "align": "left"},
+                            {"name": "count", "label": "次數", "field": "count"},
+                            {"name": "avg", "label": "平均 (ms)", "field": "avg"},
+                            {"name": "max", "label": "最大 (ms)", "field": "max"},
+                        ],
+                        rows=[],
+                        row_key="stage",
+                    ).classes("w-full")
+                    stats_table.props("dense flat")
+
             # 右半邊：投影片下載
             with ui.column().classes("gap-4"):
                 with ui.card().classes("w-full"):
@@ -84,7 +170,7 @@ def run_nicegui(command_queue: Queue, credentials_queue: Queue, status_queue: Qu
                         with row:
                             url_input = ui.input(
                                 label=f"投影片網址 {index + 1}",
-                                placeholder="請輸入投影片網址",
+                                placeholder="請輸入投影片或課程頁面網址",
                             ).classes("flex-grow whitespace-pre-wrap break-all")
                             url_inputs.append(url_input)
 
@@ -110,11 +196,20 @@ def run_nicegui(command_queue: Queue, credentials_queue: Queue, status_queue: Qu
                     def submit_urls():
                         valid_urls = [url.value for url in url_inputs if url.value]
                         if valid_urls:
-                            command_queue.put(("download_slides", valid_urls))
+                            command_queue.put(DownloadCommand(valid_urls))
+
+                    def watch_urls(remove: bool = False):
+                        valid_urls = [url.value for url in url_inputs if url.value]
+                        if valid_urls:
+                            command_queue.put(WatchCommand(valid_urls, remove=remove))
 
                     with ui.row():
                         ui.button("新增網址", on_click=add_url_input)
                         ui.button("開始下載投影片", on_click=submit_urls)
+                    with ui.row():
+                        ui.button("加入追蹤", on_click=lambda: watch_urls())
+                        ui.button("取消追蹤", on_click=lambda: watch_urls(remove=True))
+                        ui.button("立即同步", on_click=lambda: command_queue.put(SyncCommand()))
 
                     # 預設新增一個網址輸入框
                     add_url_input()
@@ -124,60 +219,104 @@ def run_nicegui(command_queue: Queue, credentials_queue: Queue, status_queue: Qu
                     ui.label("下載狀態").classes("text-h6")
                     status_container = ui.column().classes("w-full gap-2")
 
-                    # 新增進度條
-                    progress_bar = ui.linear_progress().classes("w-full")
-                    progress_bar.props('color="primary"')
-                    progress_bar.visible = False
-                    progress_text = ui.label().classes("text-sm text-gray-600 text-center w-full")
-                    progress_text.visible = False
-
-                    # 新增當前下載的簡報名稱
-                    current_slide_label = ui.label().classes("text-lg font-bold")
-                    current_slide_label.visible = False
-
-                    # 新增詳細狀態訊息
+                    # 整體狀態與已完成的簡報數量
                     status_label = ui.label().classes("text-body1")
                     status_label.visible = False
+                    summary_label = ui.label().classes("text-sm text-gray-600")
+                    summary_label.visible = False
+                    results = {"success": 0, "failed": 0}
+
+                    # 每份簡報各自的進度區塊，收到該簡報的第一個事件時才建立
+                    deck_panels: Dict[str, Dict[str, Any]] = {}
+
+        def get_deck_panel(deck_id: str) -> Dict[str, Any]:
+            if deck_id not in deck_panels:
+                with status_container:
+                    with ui.column().classes("w-full gap-1"):
+                        # 當前下載的簡報名稱
+                        title_label = ui.label(deck_id).classes("text-lg font-bold break-all")
+                        # 進度條
+                        progress_bar = ui.linear_progress().classes("w-full")
+                        progress_bar.props('color="primary"')
+                        progress_text = ui.label().classes("text-sm text-gray-600 text-center w-full")
+                        # 詳細狀態訊息
+                        deck_status_label = ui.label().classes("text-body1")
+                deck_panels[deck_id] = {
+                    "title": title_label,
+                    "progress_bar": progress_bar,
+                    "progress_text": progress_text,
+                    "status": deck_status_label,
+                }
+            return deck_panels[deck_id]
+
+        def render_deck(event: ProgressEvent):
+            panel = get_deck_panel(event.deck_id)
+            if event.title:
+                panel["title"].text = event.title
+
+            panel["progress_bar"].set_value(event.fraction)
+            if event.stage == Stage.FAILED:
+                panel["progress_bar"].props('color="negative"')
+            progress = f"{event.fraction * 100:.0f}%"
+            if event.total:
+                progress = f"{event.done}/{event.total} ({progress})"
+            if event.bytes:
+                progress += f"・{format_bytes(event.bytes)}・{format_bytes(event.throughput)}/s"
+            panel["progress_text"].text = progress
+
+            worker = f"Worker {event.worker_id}・" if event.worker_id != COORDINATOR_ID else ""
+            panel["status"].text = f"{worker}{Stage.LABELS.get(event.stage, event.stage)}"
+            if event.stage == Stage.FAILED and event.message:
+                panel["status"].text += f"：{event.message}"
+
+        def render_stats():
+            snapshot = merge_snapshots(list(process_metrics.values()))
+            counters = snapshot["counters"]
+            stats_label.text = (
+                f"簡報：完成 {counters.get('deck.done', 0):.0f}、已是最新 {counters.get('deck.up_to_date', 0):.0f}、"
+                f"失敗 {counters.get('deck.failed', 0):.0f}\n"
+                f"投影片請求：{counters.get('slide.requests', 0):.0f}"
+                f"（304：{counters.get('slide.not_modified', 0):.0f}），"
+                f"傳輸 {format_bytes(counters.get('slide.bytes', 0))}"
+            )
+            stats_table.rows = [
+                {
+                    "stage": name,
+                    "count": timer["count"],
+                    "avg": f"{timer['sum'] / timer['count'] * 1000:.1f}" if timer["count"] else "-",
+                    "max": f"{(timer['max'] or 0) * 1000:.1f}",
+                }
+                for name, timer in sorted(snapshot["timers"].items())
+            ]
+            stats_table.update()
 
         def check_status():
             try:
-                status = status_queue.get_nowait()
-                with status_container:
-                    # 解析狀態訊息
-                    if status.startswith("開始下載簡報："):
-                        current_slide_label.text = status
-                        current_slide_label.visible = True
-                        progress_bar.visible = True
-                        progress_text.visible = True
-                        status_label.visible = True
-                        progress_bar.set_value(0)
-                        progress_text.text = "0%"
-                    elif status.startswith("下載進度："):
-                        # 從進度訊息中提取百分比
-                        try:
-                            percent = float(status.split("(")[1].split("%")[0])
-                            progress_bar.set_value(percent / 100)
-                            progress_text.text = f"{int(percent)}%"
-                            status_label.text = status
-                        except (ValueError, IndexError):
-                            status_label.text = status
-                    elif status.startswith("簡報下載完成："):
-                        current_slide_label.text = status
-                        status_label.text = "下載完成！"
-                        progress_bar.set_value(1)
-                        progress_text.text = "100%"
-                    elif status.startswith("PDF 檔案生成失敗："):
-                        current_slide_label.text = status
-                        status_label.text = "PDF 生成失敗！"
-                        progress_bar.set_value(0)
-                        progress_text.text = "0%"
-                    else:
-                        status_label.text = status
-                        status_label.visible = True
+                # 一次處理所有累積的事件，每份簡報只繪製最新的狀態
+                batch = drain_events(status_queue)
+                if not batch:
+                    return
+
+                if batch.status is not None:
+                    status_label.text = batch.status.message
+                    status_label.visible = True
+
+                for event in batch.latest.values():
+                    render_deck(event)
+
+                if batch.metrics:
+                    process_metrics.update(batch.metrics)
+                    render_stats()
+
+                # 統計每份簡報的結果
+                finished = batch.finished
+                for event in finished:
+                    results["failed" if event.stage == Stage.FAILED else "success"] += 1
+                if finished:
+                    summary_label.text = f"已完成 {results['success']} 份簡報，失敗 {results['failed']} 份"
+                    summary_label.visible = True
 
                 ui.update()
-            except Empty:
-                pass
             except Exception as e:
                 logging.error(f"Error in check_status: {str(e)}")
                 ui.notify(f"更新狀態時發生錯誤：{str(e)}", type="negative")
@@ -192,10 +331,33 @@ def run_nicegui(command_queue: Queue, credentials_queue: Queue, status_queue: Qu
     )
 
 
-def run_selenium(command_queue: Queue, credentials_queue: Queue, status_queue: Queue):
-    browser = Browser()
+def run_selenium(command_queue: Queue, status_queue: Queue, job_queue: Queue):
+    """負責登入並分派下載工作的行程，登入後的 cookies 會隨每份工作交給下載 worker
+
+    以阻塞方式等待命令，等待逾時時才檢查瀏覽器是否仍在執行，閒置時不會佔用 CPU。
+    設定 ILEARNING_SYNC_INTERVAL 時，也會在等待逾時時定期同步追蹤清單；
+    同步的簡報要等下載 worker 回報下載成功後才記錄同步狀態。
+    """
+    # 輸出設定與下載 worker 相同，同步時才能正確判斷本機 PDF 是否為最新
+    browser = Browser(
+        rate_limiter=HostRateLimiter(get_rate_limit()),
+        fast_load=get_fast_load(),
+        export_profile=get_export_profile(),
+    )
+    syncer = DeckSyncer(browser, SyncState.load())
+    # 已交給下載 worker、尚未回報結果的同步工作：簡報網址 -> (檢查結果, 是否為完整檢查)
+    pending_sync: Dict[str, Tuple[DeckCheck, bool]] = {}
+    sync_interval = get_sync_interval()
+    metrics.configure(metrics_log_path(), worker=COORDINATOR_ID)
+    # 等待使用者輸入帳密的同時先載入 OCR 模型
+    browser.warm_ocr()
+
+    def report(message: str):
+        status_queue.put(StatusEvent(message, COORDINATOR_ID))
 
     def cleanup():
+        if not browser.driver_started:
+            return
         try:
             browser.driver.quit()
         except Exception as e:
@@ -203,59 +365,192 @@ def run_selenium(command_queue: Queue, credentials_queue: Queue, status_queue: Q
 
     atexit.register(cleanup)
 
+    def check_browser_alive():
+        # 沿用快取 session 時瀏覽器可能尚未啟動
+        if not browser.driver_started:
+            return
+        try:
+            if browser.driver.window_handles:
+                return
+        except Exception:
+            pass
+        logging.info("Browser has been closed, exiting...")
+        cleanup()
+        os._exit(0)
+
+    def handle_login(command: LoginCommand):
+        logging.info(f"Logging in with account: {command.account} at {command.login_url}")
+        browser.login_url = command.login_url
+        try:
+            if browser.login(command.account, command.password):
+                report("登入成功")
+            else:
+                report("登入失敗，請重新再試")
+        except Exception as e:
+            logging.error(f"Error during login: {str(e)}")
+            report(f"登入失敗：{str(e)}")
+        status_queue.put(MetricsEvent(COORDINATOR_ID, metrics.snapshot()))
+
+    def handle_download(command: DownloadCommand):
+        try:
+            # 同一批中重複的網址或簡報編號只下載一次，避免多個 worker 同時寫入同一個資料夾
+            decks = DeckQueue()
+            for url in command.urls:
+                # 不是簡報網址時視為課程頁面，找出頁面上所有的簡報
+                if deck_id(url) is not None:
+                    decks.add(url)
+                    continue
+                logging.info(f"Discovering decks at course URL: {url}")
+                found = browser.discover_decks(url)
+                added = decks.add_all(found)
+                report(f"課程頁面找到 {len(found)} 份簡報，新增 {added} 份")
+
+            # 所有 worker 共用同一次登入，不需要各自辨識驗證碼
+            session = browser.export_session()
+            unique_urls = decks.pop_all()
+            for url in unique_urls:
+                job_queue.put((url, browser.login_url, session, False))
+                status_queue.put(ProgressEvent(url, Stage.QUEUED))
+            report(f"已加入下載佇列：{len(unique_urls)} 份簡報")
+        except Exception as e:
+            logging.error(f"Error during slides download: {str(e)}")
+            report(f"下載投影片時發生錯誤：{str(e)}")
+
+    def handle_watch(command: WatchCommand):
+        if command.remove:
+            report(f"已取消追蹤 {syncer.state.remove(command.urls)} 個網址")
+        else:
+            report(f"已加入追蹤 {syncer.state.add(command.urls)} 個網址，共 {len(syncer.state.watch)} 個")
+        syncer.state.save()
+
+    def handle_sync(command: SyncCommand):
+        if not browser.cookies_synced:
+            report("請先登入再同步追蹤清單")
+            return
+        session = browser.export_session()
+        try:
+            # 上次同步的工作仍在下載中時不重複加入，結果回報後才記錄同步狀態
+            changed = [(check, full) for check, full in syncer.plan() if check.url not in pending_sync]
+            for check, full in changed:
+                pending_sync[check.url] = (check, full)
+                job_queue.put((check.url, browser.login_url, session, True))
+                status_queue.put(ProgressEvent(check.url, Stage.QUEUED))
+            report(f"同步完成：{len(changed)} 份簡報有更新，已加入下載佇列")
+        except SessionExpiredError:
+            report("登入已過期，請重新登入後再同步")
+        except Exception as e:
+            logging.error(f"Error during sync: {str(e)}")
+            report(f"同步時發生錯誤：{str(e)}")
+
+    def handle_sync_result(command: SyncResultCommand):
+        entry = pending_sync.pop(command.url, None)
+        # 下載失敗時不記錄新的狀態，下次同步會再試一次
+        if entry is None or not command.success:
+            return
+        check, full = entry
+        syncer.state.commit(check, full=full)
+        syncer.state.save()
+
+    handlers = {
+        LoginCommand: handle_login,
+        DownloadCommand: handle_download,
+        WatchCommand: handle_watch,
+        SyncCommand: handle_sync,
+        SyncResultCommand: handle_sync_result,
+    }
+
     try:
+        next_liveness_check = time.monotonic() + LIVENESS_CHECK_INTERVAL
+        next_sync = time.monotonic() + sync_interval if sync_interval else float("inf")
         while True:
+            timeout = max(0.0, min(next_liveness_check, next_sync) - time.monotonic())
             try:
-                # 檢查瀏覽器是否已被關閉
-                try:
-                    if not browser.driver.window_handles:
-                        logging.info("Browser has been closed, exiting...")
-                        cleanup()
-                        os._exit(0)
-                except Exception:
-                    logging.info("Browser has been closed, exiting...")
-                    cleanup()
-                    os._exit(0)
-
-                # 檢查登入資訊
-                login_url, account, password = credentials_queue.get_nowait()
-                logging.info(f"Logging in with account: {account} at {login_url}")
-                browser.login_url = login_url
-                if browser.login(account, password):
-                    status_queue.put("登入成功")
-                else:
-                    status_queue.put("登入失敗，請重新再試")
+                command = command_queue.get(timeout=timeout)
             except Empty:
-                pass  # Queue 為空是正常的，不需要記錄
-            except Exception as e:
-                logging.error(f"Error during login: {str(e)}")
-                status_queue.put(f"登入失敗：{str(e)}")
+                command = None
 
-            try:
-                # 檢查命令
-                command, urls = command_queue.get_nowait()
-                if command == "download_slides":
-                    for url in urls:
-                        logging.info(f"Processing slides at URL: {url}")
-                        status_queue.put(f"正在下載投影片：{url}")
-                        if browser.get_slides(url, status_queue.put):
-                            status_queue.put(f"成功下載投影片：{url}")
-                        else:
-                            status_queue.put(f"下載投影片失敗：{url}")
-            except Empty:
-                pass  # Queue 為空是正常的，不需要記錄
-            except Exception as e:
-                logging.error(f"Error during slides download: {str(e)}")
-                status_queue.put(f"下載投影片時發生錯誤：{str(e)}")
+            if command is not None:
+                handler = handlers.get(type(command))
+                if handler:
+                    handler(command)
+                else:
+                    logging.error(f"Unknown command: {command!r}")
 
-            # 短暫休息以減少 CPU 使用率
-            time.sleep(0.1)
+            # 低頻率檢查瀏覽器是否已被關閉，避免每次迴圈都對 WebDriver 發出請求
+            if time.monotonic() >= next_liveness_check:
+                check_browser_alive()
+                next_liveness_check = time.monotonic() + LIVENESS_CHECK_INTERVAL
+
+            if time.monotonic() >= next_sync:
+                if browser.cookies_synced and syncer.state.watch:
+                    handle_sync(SyncCommand())
+                next_sync = time.monotonic() + sync_interval
     except KeyboardInterrupt:
         logging.info("Received keyboard interrupt, cleaning up...")
         cleanup()
         sys.exit(0)
 
 
+def run_download_worker(
+    worker_id: int,
+    job_queue: Queue,
+    status_queue: Queue,
+    command_queue: Queue,
+    rate_limit: float = 0.0,
+):
+    """從共用的工作佇列取出簡報並下載，只在頁面需要 JavaScript 時才啟動 headless 瀏覽器
+
+    `rate_limit` 為這個 worker 分到的每秒請求數，所有 worker 加總即為對網站的整體限制。
+    同步追蹤清單產生的工作完成後，透過 `command_queue` 回報結果給分派行程。
+    """
+    browser = Browser(
+        headless=True,
+        use_session_cache=False,
+        rate_limiter=HostRateLimiter(rate_limit),
+        fast_load=get_fast_load(),
+        export_profile=get_export_profile(),
+    )
+    metrics.configure(metrics_log_path(), worker=worker_id)
+
+    def report(event: ProgressEvent):
+        event.worker_id = worker_id
+        status_queue.put(event)
+
+    def cleanup():
+        if not browser.driver_started:
+            return
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logging.error(f"Error during worker {worker_id} browser cleanup: {str(e)}")
+
+    atexit.register(cleanup)
+
+    try:
+        while True:
+            job = job_queue.get()
+            if job is None:
+                break
+
+            url, login_url, session, sync = job
+            success = False
+            try:
+                browser.login_url = login_url
+                browser.import_session(session)
+                logging.info(f"Worker {worker_id} processing slides at URL: {url}")
+                success = browser.get_slides(url, report)
+            except Exception as e:
+                logging.error(f"Error during slides download in worker {worker_id}: {str(e)}")
+                report(ProgressEvent(url, Stage.FAILED, message=str(e)))
+            if sync:
+                command_queue.put(SyncResultCommand(url, success))
+            status_queue.put(MetricsEvent(worker_id, metrics.snapshot()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cleanup()
+
+
 if __name__ == "__main__":
     from multiprocessing import freeze_support
 
@@ -263,14 +558,26 @@ if __name__ == "__main__":
     logging.info("Starting iLearning PPT Downloader")
 
     command_queue: Queue = Queue()
-    credentials_queue: Queue = Queue()
     status_queue: Queue = Queue()
-    selenium_process = Process(target=run_selenium, args=(command_queue, credentials_queue, status_queue))
+    job_queue: Queue = Queue()
+    selenium_process = Process(target=run_selenium, args=(command_queue, status_queue, job_queue))
+    # 整體的請求速率平均分配給每個 worker 行程
+    worker_count = get_worker_count()
+    worker_rate_limit = get_rate_limit() / worker_count
+    worker_processes = [
+        Process(
+            target=run_download_worker,
+            args=(worker_id, job_queue, status_queue, command_queue, worker_rate_limit),
+            daemon=True,
+        )
+        for worker_id in range(1, worker_count + 1)
+    ]
 
     def signal_handler(signum, frame):
         logging.info(f"Received signal {signum}, cleaning up...")
-        selenium_process.terminate()
-        selenium_process.join()
+        for process in [selenium_process, *worker_processes]:
+            process.terminate()
+            process.join()
         sys.exit(0)
 
     # System signal handler
@@ -282,9 +589,15 @@ if __name__ == "__main__":
             logging.info("Cleaning up selenium process...")
             selenium_process.terminate()
             selenium_process.join()
+        for process in worker_processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
 
     atexit.register(cleanup)
 
     selenium_process.start()
-    run_nicegui(command_queue, credentials_queue, status_queue)
+    for process in worker_processes:
+        process.start()
+    run_nicegui(command_queue, status_queue)
     selenium_process.join()
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def temp_path(path: str) -> str:
+    """同一目標檔案的暫存檔名，加上行程與執行緒編號，多個 worker 同時寫入時不會互相覆寫"""
+    return f"{path}.{os.getpid()}-{threading.get_ident()}.part"
+
+
+def atomic_write(path: str, data: bytes):
+    """先寫入暫存檔再改名，中途中斷時不會留下不完整的檔案"""
+    tmp_path = temp_path(path)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """以 `<path>.lock` 取得跨行程的獨占鎖，讓多個行程依序對同一個檔案讀取、合併再寫回"""
+    with open(f"{path}.lock", "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            # LK_LOCK 最多重試 10 秒後拋出 OSError，持續等待直到取得鎖
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def validator_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """依紀錄中的 ETag / Last-Modified 產生條件式請求的標頭"""
+    headers: Dict[str, str] = {}
+    if entry is None:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+class DeckManifest:
+    """記錄一份簡報已下載的投影片與 PDF，供續傳與條件式請求使用
+
+    保存在 `slides/<簡報名稱>/manifest.json`，每張投影片記錄網址、檔名、大小、
+    SHA-256、ETag 與 Last-Modified，PDF 則記錄產生時的投影片網址順序。
+    `deck_url` 為簡報頁面的網址，用來分辨名稱相同的不同簡報。
+    """
+
+    FILENAME = "manifest.json"
+
+    def __init__(self, deck_dir: str):
+        self.deck_dir = deck_dir
+        self.path = os.path.join(deck_dir, self.FILENAME)
+        self.deck_url: Optional[str] = None
+        self.slides: Dict[str, Dict[str, Any]] = {}
+        self.pdf: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def load(cls, deck_dir: str) -> "DeckManifest":
+        manifest = cls(deck_dir)
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+
+        manifest.deck_url = data.get("deck_url")
+        manifest.slides = {slide["url"]: slide for slide in data.get("slides", [])}
+        manifest.pdf = data.get("pdf")
+        return manifest
+
+    def save(self):
+        data = {"deck_url": self.deck_url, "slides": list(self.slides.values()), "pdf": self.pdf}
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.slides.get(url)
+
+    def record(self, url: str, filename: str, data: bytes, etag: Optional[str], last_modified: Optional[str]):
+        self.record_digest(url, filename, hashlib.sha256(data).hexdigest(), len(data), etag, last_modified)
+
+    def record_digest(
+        self,
+        url: str,
+        filename: str,
+        digest: str,
+        size: int,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ):
+        """以已知的 SHA-256 與大小記錄投影片，不需要再讀取圖片內容"""
+        self.slides[url] = {
+            "url": url,
+            "file": filename,
+            "size": size,
+            "sha256": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    def refresh(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        """收到 304 時更新伺服器回傳的新驗證資訊"""
+        entry = self.slides.get(url)
+        if entry is None:
+            return
+        if etag:
+            entry["etag"] = etag
+        if last_modified:
+            entry["last_modified"] = last_modified
+
+    def has_local_file(self, url: str) -> bool:
+        """本機檔案存在且大小與紀錄相符"""
+        entry = self.slides.get(url)
+        if entry is None:
+            return False
+        path = os.path.join(self.deck_dir, entry["file"])
+        try:
+            return os.path.getsize(path) == entry["size"]
+        except OSError:
+            return False
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        return validator_headers(self.slides.get(url))
+
+    def pdf_is_current(self, urls: List[str], profile: str = "original") -> bool:
+        """PDF 存在、大小與紀錄相符，且產生時的投影片順序與 `urls`、輸出設定與 `profile` 相同"""
+        if not self.pdf or self.pdf.get("urls") != urls:
+            return False
+        if self.pdf.get("profile", "original") != profile:
+            return False
+        if not all(url in self.slides for url in urls):
+            return False
+        try:
+            return os.path.getsize(os.path.join(self.deck_dir, self.pdf["file"])) == self.pdf["size"]
+        except OSError:
+            return False
+
+    def invalidate_pdf(self):
+        """投影片內容變更後 PDF 紀錄即失效，直到重新產生的 PDF 以 `record_pdf` 記錄為止"""
+        self.pdf = None
+
+    def record_pdf(self, filename: str, urls: List[str], profile: str = "original"):
+        self.pdf = {
+            "file": filename,
+            "size": os.path.getsize(os.path.join(self.deck_dir, filename)),
+            "urls": list(urls),
+            "profile": profile,
+        }
+        # 只保留目前簡報中的投影片，並依投影片順序排列
+        self.slides = {url: self.slides[url] for url in urls if url in self.slides}
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+# 延遲直方圖的區間上限（秒）
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        # 最後一格為超過所有區間上限的數量
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "sum": self.sum, "min": self.min, "max": self.max, "buckets": list(self.buckets)}
+
+
+class Metrics:
+    """各階段的計時器與計數器
+
+    每個行程各自記錄，透過 `snapshot()` 取得目前的數值；設定 `jsonl_path` 後，
+    每筆計時結果也會以一行 JSON 附加到檔案中。檔案寫入使用獨立的鎖與持續開啟的檔案，
+    計數器與直方圖的更新不會等待磁碟 I/O。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.timers: Dict[str, Histogram] = {}
+        self.jsonl_path: Optional[str] = None
+        self.labels: Dict[str, Any] = {}
+        self.file_lock = threading.Lock()
+        self.file: Optional[TextIO] = None
+
+    def configure(self, jsonl_path: Optional[str] = None, **labels):
+        """設定 JSON lines 輸出路徑，`labels` 會附加在每一行紀錄中（例如 worker 編號）"""
+        with self.file_lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.jsonl_path = jsonl_path
+            self.labels = labels
+
+    def inc(self, name: str, value: float = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float, **fields):
+        with self.lock:
+            if name not in self.timers:
+                self.timers[name] = Histogram()
+            self.timers[name].observe(seconds)
+        self.write_record({"type": "timer", "name": name, "seconds": round(seconds, 6), **fields})
+
+    @contextmanager
+    def timer(self, name: str, **fields) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **fields)
+
+    def write_record(self, record: Dict[str, Any]):
+        """附加一行紀錄，呼叫端不應持有其他鎖"""
+        if not self.jsonl_path:
+            return
+        record = {"ts": round(time.time(), 3), "pid": os.getpid(), **self.labels, **record}
+        line = json.dumps(record, ensure_ascii=False)
+        with self.file_lock:
+            if self.file is None:
+                # 以行為單位緩衝，每筆紀錄一次寫入，多個行程附加到同一個檔案時不會交錯
+                self.file = open(self.jsonl_path, "a", encoding="utf-8", buffering=1)
+            self.file.write(line + "\n")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "timers": {name: histogram.to_dict() for name, histogram in self.timers.items()},
+            }
+
+
+# 每個行程共用的 metrics 實例
+metrics = Metrics()
+
+
+def metrics_log_path(log_dir: str = "log") -> str:
+    """與每日 log 檔放在同一個資料夾的 JSON lines 檔案路徑"""
+    return os.path.join(log_dir, f"ilearning_ppt_downloader_metrics_{datetime.now().strftime('%Y%m%d')}.jsonl")
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """合併多個行程的 snapshot，計數器相加、直方圖逐格相加"""
+    counters: Dict[str, float] = {}
+    timers: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, value in snapshot.get("counters", {}).items():
+            counters[name] = counters.get(name, 0) + value
+        for name, histogram in snapshot.get("timers", {}).items():
+            if name not in timers:
+                timers[name] = {**histogram, "buckets": list(histogram["buckets"])}
+                continue
+            merged = timers[name]
+            merged["count"] += histogram["count"]
+            merged["sum"] += histogram["sum"]
+            merged["buckets"] = [a + b for a, b in zip(merged["buckets"], histogram["buckets"], strict=True)]
+            for key, pick in (("min", min), ("max", max)):
+                values = [value for value in (merged[key], histogram[key]) if value is not None]
+                merged[key] = pick(values) if values else None
+    return {"counters": counters, "timers": timers, "buckets": LATENCY_BUCKETS}
+
+
+def start_metrics_server(get_snapshot: Callable[[], Dict[str, Any]], port: int = 0) -> ThreadingHTTPServer:
+    """在背景執行緒提供 `GET /metrics`，回傳 `get_snapshot()` 的 JSON"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = json.dumps(get_snapshot(), ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,349 @@
+import hashlib
+import io
+import os
+import shutil
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+# A4 紙張尺寸（單位：點），與 reportlab.lib.pagesizes.A4 相同
+A4 = (595.2755905511812, 841.8897637795277)
+# 頁面邊距（單位：點）
+MARGIN = 40
+
+# 帶有影像尺寸的 SOF (Start Of Frame) marker，排除 DHT(C4)、JPG(C8)、DAC(CC)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# 不帶長度欄位的 marker
+STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+COLOR_SPACES = {1: "/DeviceGray", 3: "/DeviceRGB", 4: "/DeviceCMYK"}
+
+
+class NotJpegError(ValueError):
+    pass
+
+
+def read_jpeg_info(f: BinaryIO) -> Tuple[int, int, int]:
+    """只讀取 JPEG 檔頭取得影像資訊，不解碼影像內容
+
+    Returns:
+        Tuple[int, int, int]: (寬度, 高度, 色彩分量數)
+    """
+    if f.read(2) != b"\xff\xd8":
+        raise NotJpegError("不是 JPEG 檔案")
+
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise NotJpegError("找不到 JPEG SOF 區段")
+        if byte != b"\xff":
+            continue
+
+        # marker 前可能有多個 0xFF 填充位元組
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            raise NotJpegError("找不到 JPEG SOF 區段")
+
+        code = marker[0]
+        if code in STANDALONE_MARKERS or code == 0x00:
+            continue
+        if code in (0xD9, 0xDA):
+            raise NotJpegError("找不到 JPEG SOF 區段")
+
+        length = int.from_bytes(f.read(2), "big")
+        if code in SOF_MARKERS:
+            segment = f.read(length - 2)
+            if len(segment) < 6:
+                raise NotJpegError("JPEG SOF 區段不完整")
+            height = int.from_bytes(segment[1:3], "big")
+            width = int.from_bytes(segment[3:5], "big")
+            components = segment[5]
+            if width == 0 or height == 0 or components not in COLOR_SPACES:
+                raise NotJpegError("不支援的 JPEG 格式")
+            return width, height, components
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def fit_to_page(img_width: float, img_height: float, page_size=A4, margin: float = MARGIN):
+    """計算圖片在頁面上置中且等比例縮放後的位置與大小
+
+    Returns:
+        Tuple[float, float, float, float]: (x, y, 寬度, 高度)
+    """
+    page_width, page_height = page_size
+    # 可用區域
+    available_width = page_width - (margin * 2)
+    available_height = page_height - (margin * 2)
+
+    # 使用較小的比例，確保圖片完整顯示
+    scale = min(available_width / img_width, available_height / img_height)
+    scaled_width = img_width * scale
+    scaled_height = img_height * scale
+
+    # 計算置中位置
+    x = (page_width - scaled_width) / 2
+    y = (page_height - scaled_height) / 2
+    return x, y, scaled_width, scaled_height
+
+
+def pdf_number(value: float) -> str:
+    return f"{value:.4f}".rstrip("0").rstrip(".")
+
+
+def pdf_text(value: str) -> str:
+    """PDF 文字字串，以 UTF-16BE 十六進位表示，中文書籤名稱才能正確顯示"""
+    return f"<{(chr(0xFEFF) + value).encode('utf-16-be').hex().upper()}>"
+
+
+class JpegPdfWriter:
+    """直接將 JPEG 位元組以 DCTDecode 影像物件嵌入 PDF，不重新編碼
+
+    每加入一頁就把該頁的物件寫入檔案，只在記憶體中保留各物件的位移量，
+    最後於 `close()` 寫入頁面樹、交叉參照表與 trailer。
+    內容相同的圖片只嵌入一次，重複的投影片共用同一個影像物件與內容串流。
+    以 `add_outline` 加入的書籤會在 `close()` 時寫成 PDF 大綱。
+    """
+
+    def __init__(self, output_path: str, page_size=A4, margin: float = MARGIN):
+        self.output_path = output_path
+        self.page_size = page_size
+        self.margin = margin
+        self.file = open(output_path, "wb")
+        # 物件 1 為 Catalog、物件 2 為 Pages，於 close() 時寫入
+        self.offsets: List[int] = [0, 0]
+        self.page_ids: List[int] = []
+        # 圖片 SHA-256 -> (影像物件編號, 寬, 高)
+        self.images: Dict[str, Tuple[int, int, int]] = {}
+        # (寬, 高) -> 內容串流物件編號，繪製指令只與圖片尺寸有關
+        self.contents: Dict[Tuple[int, int], int] = {}
+        # (書籤名稱, 頁面索引)
+        self.outline: List[Tuple[str, int]] = []
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def reserve_id(self) -> int:
+        self.offsets.append(0)
+        return len(self.offsets)
+
+    def begin_object(self, object_id: int):
+        self.offsets[object_id - 1] = self.file.tell()
+        self.file.write(f"{object_id} 0 obj\n".encode("ascii"))
+
+    def write_object(self, object_id: int, body: str):
+        self.begin_object(object_id)
+        self.file.write(body.encode("ascii"))
+        self.file.write(b"\nendobj\n")
+
+    def write_stream(self, object_id: int, dictionary: str, source, length: int):
+        """寫入 stream 物件，`source` 可以是位元組或已開啟的檔案"""
+        self.begin_object(object_id)
+        self.file.write(f"<< {dictionary} /Length {length} >>\nstream\n".encode("ascii"))
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.file.write(source)
+        else:
+            shutil.copyfileobj(source, self.file)
+        self.file.write(b"\nendstream\nendobj\n")
+
+    def add_image(self, width: int, height: int, components: int, source, length: int) -> int:
+        image_id = self.reserve_id()
+        dictionary = (
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {COLOR_SPACES[components]} /BitsPerComponent 8 /Filter /DCTDecode"
+        )
+        if components == 4:
+            # Adobe 產生的 CMYK JPEG 以反轉數值儲存
+            dictionary += " /Decode [1 0 1 0 1 0 1 0]"
+        self.write_stream(image_id, dictionary, source, length)
+        return image_id
+
+    def add_page(self, image_id: int, width: int, height: int):
+        """新增一頁並將指定的影像物件置中繪製，`width`、`height` 為排版使用的圖片尺寸"""
+        content_id = self.contents.get((width, height))
+        if content_id is None:
+            x, y, scaled_width, scaled_height = fit_to_page(width, height, self.page_size, self.margin)
+            content = (
+                f"q {pdf_number(scaled_width)} 0 0 {pdf_number(scaled_height)} "
+                f"{pdf_number(x)} {pdf_number(y)} cm /Im0 Do Q"
+            ).encode("ascii")
+            content_id = self.reserve_id()
+            self.write_stream(content_id, "", content, len(content))
+            self.contents[(width, height)] = content_id
+
+        page_id = self.reserve_id()
+        page_width, page_height = self.page_size
+        self.write_object(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {pdf_number(page_width)} {pdf_number(page_height)}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>",
+        )
+        self.page_ids.append(page_id)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_ids)
+
+    def add_outline(self, title: str, page_index: Optional[int] = None):
+        """加入指向第 `page_index` 頁（預設為下一頁）的書籤"""
+        self.outline.append((title, self.page_count if page_index is None else page_index))
+
+    def truncate(self, page_count: int):
+        """移除第 `page_count` 頁之後的頁面與書籤
+
+        已寫入的物件仍留在檔案中但不再被引用，之後相同的圖片也可以繼續共用。
+        """
+        del self.page_ids[page_count:]
+        self.outline = [(title, index) for title, index in self.outline if index < page_count]
+
+    def add_known_image(self, digest: str) -> bool:
+        """圖片已經嵌入過時直接新增引用同一個影像物件的頁面"""
+        if digest not in self.images:
+            return False
+        self.add_page(*self.images[digest])
+        return True
+
+    def add_jpeg(
+        self,
+        data: bytes,
+        digest: Optional[str] = None,
+        layout_size: Optional[Tuple[int, int]] = None,
+    ):
+        """以 JPEG 位元組新增一頁
+
+        Args:
+            data: JPEG 內容
+            digest: 去除重複圖片用的雜湊值，預設為內容的 SHA-256
+            layout_size: 排版使用的圖片尺寸，縮圖後的圖片以原始尺寸排版，版面才會與原始 PDF 相同
+        """
+        digest = digest or hashlib.sha256(data).hexdigest()
+        if self.add_known_image(digest):
+            return
+        width, height, components = read_jpeg_info(io.BytesIO(data))
+        image_id = self.add_image(width, height, components, data, len(data))
+        self.images[digest] = (image_id, *(layout_size or (width, height)))
+        self.add_page(*self.images[digest])
+
+    def add_image_bytes(self, data: bytes):
+        """以任意格式的圖片位元組新增一頁，非 JPEG 圖片會先在記憶體中轉為 JPEG"""
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            self.add_jpeg(data, digest)
+        except NotJpegError:
+            self.add_jpeg(to_jpeg(data), digest)
+
+    def add_jpeg_file(self, path: str):
+        """以 JPEG 檔案新增一頁，檔案內容直接複製進 PDF 而不整份載入記憶體"""
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+            if self.add_known_image(digest):
+                return
+            f.seek(0)
+            width, height, components = read_jpeg_info(f)
+            length = os.fstat(f.fileno()).st_size
+            f.seek(0)
+            image_id = self.add_image(width, height, components, f, length)
+        self.images[digest] = (image_id, width, height)
+        self.add_page(image_id, width, height)
+
+    def abort(self):
+        """關閉檔案但不寫入結尾，用於發生錯誤時放棄產生中的 PDF"""
+        self.file.close()
+
+    def close(self):
+        if self.file.closed:
+            return
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self.write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        catalog = "/Type /Catalog /Pages 2 0 R"
+        outlines_id = self.write_outline()
+        if outlines_id is not None:
+            catalog += f" /Outlines {outlines_id} 0 R /PageMode /UseOutlines"
+        self.write_object(1, f"<< {catalog} >>")
+
+        xref_offset = self.file.tell()
+        lines = [f"xref\n0 {len(self.offsets) + 1}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{offset:010d} 00000 n \n" for offset in self.offsets)
+        lines.append(f"trailer\n<< /Size {len(self.offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self.file.write("".join(lines).encode("ascii"))
+        self.file.close()
+
+    def write_outline(self) -> Optional[int]:
+        """寫入書籤，回傳大綱物件編號，沒有書籤時回傳 None"""
+        # 沒有任何頁面的書籤無處可指
+        entries = [(title, self.page_ids[index]) for title, index in self.outline if index < len(self.page_ids)]
+        if not entries:
+            return None
+
+        outlines_id = self.reserve_id()
+        item_ids = [self.reserve_id() for _ in entries]
+        for position, (title, page_id) in enumerate(entries):
+            links = ""
+            if position > 0:
+                links += f" /Prev {item_ids[position - 1]} 0 R"
+            if position < len(entries) - 1:
+                links += f" /Next {item_ids[position + 1]} 0 R"
+            self.write_object(
+                item_ids[position],
+                f"<< /Title {pdf_text(title)} /Parent {outlines_id} 0 R{links} /Dest [{page_id} 0 R /Fit] >>",
+            )
+        self.write_object(
+            outlines_id,
+            f"<< /Type /Outlines /First {item_ids[0]} 0 R /Last {item_ids[-1]} 0 R /Count {len(entries)} >>",
+        )
+        return outlines_id
+
+
+def to_jpeg(data: bytes, quality: int = 95) -> bytes:
+    """將 PIL 可開啟的圖片轉換為 JPEG 位元組"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        output = io.BytesIO()
+        img.convert("RGB").save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+def write_jpeg_pdf(image_paths: List[str], output_path: str):
+    """將 JPEG 圖片直接嵌入 PDF，版面與 `write_reportlab_pdf` 相同
+
+    遇到非 JPEG 圖片時會拋出 NotJpegError，且不留下未完成的檔案。
+    """
+    try:
+        with JpegPdfWriter(output_path) as writer:
+            for image_path in image_paths:
+                writer.add_jpeg_file(image_path)
+    except BaseException:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+
+
+def write_reportlab_pdf(image_paths: List[str], output_path: str):
+    """以 PIL 讀取尺寸並透過 reportlab 繪製圖片，支援任何 PIL 可開啟的格式"""
+    from PIL import Image
+    from reportlab.pdfgen import canvas
+
+    # 創建 PDF 文件
+    c = canvas.Canvas(output_path, pagesize=A4)
+
+    for image_path in image_paths:
+        # 獲取圖片尺寸
+        with Image.open(image_path) as img:
+            img_width, img_height = img.size
+
+        x, y, scaled_width, scaled_height = fit_to_page(img_width, img_height)
+
+        # 將圖片繪製到 PDF
+        c.drawImage(image_path, x, y, width=scaled_width, height=scaled_height)
+        c.showPage()
+
+    # 保存 PDF
+    c.save()
@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+from queue import Empty
+from typing import Any, Dict, List, Optional, Union
+
+
+class Stage:
+    """簡報下載的各個階段"""
+
+    QUEUED = "queued"
+    RESOLVING = "resolving"
+    DOWNLOADING = "downloading"
+    DONE = "done"
+    UP_TO_DATE = "up_to_date"
+    FAILED = "failed"
+
+    FINISHED = (DONE, UP_TO_DATE, FAILED)
+
+    LABELS = {
+        QUEUED: "等待下載",
+        RESOLVING: "取得簡報資訊",
+        DOWNLOADING: "下載中",
+        DONE: "下載完成",
+        UP_TO_DATE: "已是最新",
+        FAILED: "下載失敗",
+    }
+
+
+@dataclass
+class ProgressEvent:
+    """單一簡報的進度，`deck_id` 為簡報網址"""
+
+    deck_id: str
+    stage: str
+    worker_id: int = 0
+    title: str = ""
+    done: int = 0
+    total: int = 0
+    bytes: int = 0
+    # 每秒下載的位元組數
+    throughput: float = 0.0
+    message: str = ""
+
+    @property
+    def fraction(self) -> float:
+        if self.stage in (Stage.DONE, Stage.UP_TO_DATE):
+            return 1.0
+        return self.done / self.total if self.total else 0.0
+
+
+@dataclass
+class StatusEvent:
+    """與特定簡報無關的狀態訊息，例如登入結果"""
+
+    message: str
+    worker_id: int = 0
+
+
+@dataclass
+class MetricsEvent:
+    """行程目前的 metrics snapshot，由 UI 合併後顯示"""
+
+    worker_id: int
+    snapshot: Dict[str, Any]
+
+
+Event = Union[ProgressEvent, StatusEvent, MetricsEvent]
+
+
+@dataclass
+class EventBatch:
+    """一次從佇列取出並合併後的事件"""
+
+    # 每份簡報最新的進度
+    latest: Dict[str, ProgressEvent] = field(default_factory=dict)
+    # 最新的狀態訊息
+    status: Optional[StatusEvent] = None
+    # 這次進入結束階段的簡報事件
+    finished: List[ProgressEvent] = field(default_factory=list)
+    # 每個行程最新的 metrics snapshot
+    metrics: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.latest or self.status or self.metrics)
+
+
+def drain_events(queue, limit: int = 10000) -> EventBatch:
+    """一次取出佇列中所有事件，每份簡報與每個行程只保留最新的狀態"""
+    batch = EventBatch()
+
+    for _ in range(limit):
+        try:
+            event = queue.get_nowait()
+        except Empty:
+            break
+        if isinstance(event, StatusEvent):
+            batch.status = event
+        elif isinstance(event, MetricsEvent):
+            batch.metrics[event.worker_id] = event.snapshot
+        else:
+            if event.stage in Stage.FINISHED:
+                batch.finished.append(event)
+            batch.latest[event.deck_id] = event
+    return batch
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
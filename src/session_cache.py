@@ -0,0 +1,103 @@
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+
+class SessionCache:
+    """將登入後的 cookies 保存在本機，下次啟動時直接沿用
+
+    每個 (登入網址, 帳號) 組合對應一個 JSON 檔案，內容包含 cookies、User-Agent、保存時間
+    與加鹽的密碼雜湊；只有輸入的密碼與保存時相同才會沿用，密碼錯誤時改為正常登入。
+    超過 `max_age` 秒或任一 cookie 已過期時視為失效。
+    """
+
+    # PBKDF2 的迭代次數，每次登入只計算一次
+    PASSWORD_ITERATIONS = 200_000
+
+    def __init__(self, cache_dir: str = "local/sessions", max_age: float = 12 * 60 * 60):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+
+    def path_for(self, login_url: str, account: str) -> str:
+        key = hashlib.sha256(f"{login_url.rstrip('/')}\n{account}".encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def hash_password(self, password: str, salt: bytes) -> str:
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, self.PASSWORD_ITERATIONS).hex()
+
+    def load(self, login_url: str, account: str, password: str) -> Optional[Dict[str, Any]]:
+        """讀取尚未過期且密碼相符的 session，失效、不存在或密碼不符時回傳 None"""
+        path = self.path_for(login_url, account)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self.is_expired(data):
+            self.clear(login_url, account)
+            return None
+        # 密碼不符時保留快取，輸入正確的密碼後仍可沿用
+        try:
+            expected = data["password_hash"]
+            actual = self.hash_password(password, bytes.fromhex(data["password_salt"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not hmac.compare_digest(expected, actual):
+            return None
+        return data
+
+    def save(
+        self,
+        login_url: str,
+        account: str,
+        password: str,
+        cookies: List[Dict[str, Any]],
+        user_agent: Optional[str] = None,
+    ):
+        # cookies 等同於登入憑證，只允許目前使用者讀寫
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        salt = os.urandom(16)
+        data = {
+            "login_url": login_url,
+            "account": account,
+            "password_salt": salt.hex(),
+            "password_hash": self.hash_password(password, salt),
+            "saved_at": time.time(),
+            "user_agent": user_agent,
+            "cookies": cookies,
+        }
+
+        # 先寫入暫存檔再取代，避免中途中斷留下損毀的檔案
+        path = self.path_for(login_url, account)
+        tmp_path = f"{path}.tmp"
+        # 先移除殘留的暫存檔，O_CREAT 的權限只在建立新檔案時生效
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def clear(self, login_url: str, account: str):
+        try:
+            os.remove(self.path_for(login_url, account))
+        except FileNotFoundError:
+            pass
+
+    def is_expired(self, data: Dict[str, Any]) -> bool:
+        now = time.time()
+        if now - data.get("saved_at", 0) > self.max_age:
+            return True
+
+        # Selenium 的 cookie 以 expiry 欄位記錄到期時間（Unix 秒）
+        for cookie in data.get("cookies", []):
+            expiry = cookie.get("expiry")
+            if expiry is not None and expiry <= now:
+                return True
+        return False
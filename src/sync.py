@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import requests
+
+from browser import Browser, SessionExpiredError
+from crawler import DeckQueue, deck_id
+from manifest import DeckManifest, atomic_write, validator_headers
+from metrics import metrics
+
+T = TypeVar("T")
+
+# 即使簡報頁面沒有變更，超過此時間（秒）仍會逐張以條件式請求確認投影片內容
+DEFAULT_FULL_CHECK_INTERVAL = 24 * 60 * 60
+
+
+@dataclass
+class DeckCheck:
+    """一次檢查的結果，下載成功後才寫入同步狀態"""
+
+    url: str
+    changed: bool
+    fingerprint: Optional[str] = None
+    title: Optional[str] = None
+    count: int = 0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    slide_urls: List[str] = field(default_factory=list)
+
+
+def fingerprint(title: Optional[str], slide_urls: List[str]) -> str:
+    """以簡報名稱與投影片網址順序計算的指紋，任何投影片增減或換圖都會改變"""
+    payload = json.dumps([title, slide_urls], ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def with_relogin(func: Callable[[str], T], url: str, relogin: Optional[Callable[[], bool]]) -> T:
+    """以 `url` 呼叫 `func`，發現已被登出時重新登入後再試一次
+
+    未提供 `relogin` 或重新登入失敗時拋出 `SessionExpiredError`。
+    """
+    try:
+        return func(url)
+    except SessionExpiredError:
+        if relogin is None or not relogin():
+            raise
+        return func(url)
+
+
+class SyncState:
+    """追蹤清單與每份簡報上次同步的狀態，保存在 `local/sync.json`，重新啟動後仍然有效"""
+
+    def __init__(self, path: str = "local/sync.json"):
+        self.path = path
+        self.watch: List[str] = []
+        self.decks: Dict[str, Dict[str, Any]] = {}
+        # 課程頁面上次找到的簡報，課程頁面暫時無法讀取時沿用
+        self.courses: Dict[str, List[str]] = {}
+
+    @classmethod
+    def load(cls, path: str = "local/sync.json") -> "SyncState":
+        state = cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return state
+        state.watch = data.get("watch", [])
+        state.decks = data.get("decks", {})
+        state.courses = data.get("courses", {})
+        return state
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {"watch": self.watch, "decks": self.decks, "courses": self.courses}
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def add(self, urls: List[str]) -> int:
+        """加入追蹤清單，回傳實際新增的數量"""
+        added = [url for url in dict.fromkeys(urls) if url not in self.watch]
+        self.watch.extend(added)
+        return len(added)
+
+    def remove(self, urls: List[str]) -> int:
+        removed = [url for url in self.watch if url in urls]
+        self.watch = [url for url in self.watch if url not in urls]
+        for url in removed:
+            self.courses.pop(url, None)
+            self.decks.pop(url, None)
+        return len(removed)
+
+    def commit(self, check: DeckCheck, full: bool = False):
+        """記錄已同步完成的簡報狀態"""
+        entry = self.decks.setdefault(check.url, {})
+        now = time.time()
+        entry.update(checked_at=now)
+        if check.fingerprint is not None:
+            entry.update(
+                fingerprint=check.fingerprint,
+                title=check.title,
+                count=check.count,
+                slides=check.slide_urls,
+                etag=check.etag,
+                last_modified=check.last_modified,
+            )
+        if check.changed:
+            entry["synced_at"] = now
+        if full:
+            entry["full_checked_at"] = now
+
+
+class DeckSyncer:
+    """定期檢查追蹤中的簡報，只有變更的簡報才會下載並重新產生 PDF
+
+    每份簡報每次只送出一個條件式請求取得簡報頁面：伺服器回傳 304，或投影片網址的指紋
+    與上次相同且本機 PDF 仍為最新時即視為未變更。超過 `full_check_interval` 秒的簡報
+    會交給 `download` 逐張以條件式請求確認，以發現網址不變但內容更新的投影片。
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        state: SyncState,
+        full_check_interval: float = DEFAULT_FULL_CHECK_INTERVAL,
+    ):
+        self.browser = browser
+        self.state = state
+        self.full_check_interval = full_check_interval
+
+    def expand(self, relogin: Optional[Callable[[], bool]] = None) -> List[str]:
+        """將追蹤清單中的課程頁面展開為簡報網址，並移除重複的簡報"""
+        decks = DeckQueue()
+        for url in self.state.watch:
+            if deck_id(url) is not None:
+                decks.add(url)
+                continue
+            try:
+                self.state.courses[url] = with_relogin(self.browser.discover_decks, url, relogin)
+            except requests.RequestException as e:
+                print(f"無法讀取課程頁面，沿用上次的簡報清單：{url}：{e}")
+            decks.add_all(self.state.courses.get(url, []))
+        return decks.pop_all()
+
+    def full_check_due(self, url: str) -> bool:
+        entry = self.state.decks.get(url, {})
+        return time.time() - entry.get("full_checked_at", 0) >= self.full_check_interval
+
+    def check(self, url: str) -> DeckCheck:
+        entry = self.state.decks.get(url, {})
+        with metrics.timer("sync.check", url=url):
+            response = self.browser.session.get(url, headers=validator_headers(entry), timeout=30)
+        metrics.inc("sync.requests")
+        if response.status_code == 304:
+            metrics.inc("sync.not_modified")
+            # 頁面未變更，但本機 PDF 可能已被刪除或輸出設定已變更，以上次的名稱與投影片清單確認
+            return DeckCheck(url, changed=not self.pdf_is_current(url, entry.get("title"), entry.get("slides")))
+        response.raise_for_status()
+        if self.browser.is_login_page(response.text):
+            raise SessionExpiredError(f"登入已過期，請重新登入：{url}")
+
+        title, slide_urls = self.browser.parse_slides(response.text)
+        check = DeckCheck(
+            url,
+            changed=True,
+            fingerprint=fingerprint(title, slide_urls),
+            title=title,
+            count=len(slide_urls),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            slide_urls=slide_urls,
+        )
+        if not title or not slide_urls:
+            # 需要瀏覽器才能取得內容的頁面，交給 get_slides 處理
+            return check
+
+        # 指紋相同且本機的 PDF 仍為最新時，不需要重新下載
+        if check.fingerprint == entry.get("fingerprint") and self.pdf_is_current(url, title, slide_urls):
+            check.changed = False
+        return check
+
+    def pdf_is_current(self, url: str, title: Optional[str], slide_urls: Optional[List[str]]) -> bool:
+        """本機 PDF 與 `slide_urls` 相符且以目前的輸出設定產生，缺少名稱或投影片清單時視為過期"""
+        if not title or not slide_urls:
+            return False
+        manifest = DeckManifest.load(self.browser.resolve_deck_dir(title, url))
+        return manifest.pdf_is_current(slide_urls, self.browser.export_profile.label)
+
+    def plan(self, relogin: Optional[Callable[[], bool]] = None) -> List[Tuple[DeckCheck, bool]]:
+        """檢查所有追蹤中的簡報，未變更的簡報直接記錄狀態
+
+        Args:
+            relogin: 發現已被登出時重新登入的函式，未提供時直接拋出 `SessionExpiredError`
+
+        Returns:
+            List[Tuple[DeckCheck, bool]]: 需要下載的簡報與是否為完整檢查，下載成功後才以
+            `SyncState.commit` 記錄，失敗時下次同步會再試一次
+        """
+        downloads: List[Tuple[DeckCheck, bool]] = []
+        try:
+            for url in self.expand(relogin):
+                try:
+                    check = with_relogin(self.check, url, relogin)
+                except requests.RequestException as e:
+                    print(f"檢查簡報失敗，下次同步時再試：{url}：{e}")
+                    continue
+
+                full = self.full_check_due(url)
+                if check.changed or full:
+                    metrics.inc("sync.changed" if check.changed else "sync.full_check")
+                    downloads.append((check, full))
+                    continue
+                self.state.commit(check)
+        finally:
+            # 中途被登出時，已確認未變更的簡報仍會記錄
+            self.state.save()
+        return downloads
+
+    def sync_once(
+        self,
+        download: Callable[[str], bool],
+        relogin: Optional[Callable[[], bool]] = None,
+    ) -> Dict[str, bool]:
+        """檢查所有追蹤中的簡報，並依序下載有變更的簡報
+
+        Args:
+            download: 下載一份簡報的函式，回傳是否成功
+            relogin: 發現已被登出時重新登入的函式，未提供時直接拋出 `SessionExpiredError`
+
+        Returns:
+            Dict[str, bool]: 有變更的簡報網址對應的下載結果
+        """
+        results: Dict[str, bool] = {}
+        for check, full in self.plan(relogin):
+            results[check.url] = download(check.url)
+            if results[check.url]:
+                self.state.commit(check, full=full)
+                self.state.save()
+        return results